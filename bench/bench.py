@@ -0,0 +1,358 @@
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date
+from typing import Callable
+
+# Micro-benchmarks de los hooks. Cada uno compara el camino actual con el de
+# referencia (el código anterior, o la regex que documenta la semántica),
+# comprueba que dan lo mismo y saca el mejor de `repeat` tiempos.
+#
+#   python bench/bench.py              # todos
+#   python bench/bench.py tokenize     # solo los indicados
+
+_THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+_HOOKS_DIR = os.path.join(os.path.dirname(_THIS_DIR), "hooks")
+if _HOOKS_DIR not in sys.path:
+    sys.path.insert(0, _HOOKS_DIR)
+
+import cache_registry as kb_registry  # noqa: E402
+import dates as kb_dates  # noqa: E402
+import parse as kb_parse  # noqa: E402
+import path_classifier as kb_paths  # noqa: E402
+import urls as kb_urls  # noqa: E402
+from tag_colors import norm_tag  # noqa: E402
+
+BENCHES: dict[str, Callable[[argparse.Namespace], None]] = {}
+
+
+def bench(name: str):
+    def register(fn):
+        BENCHES[name] = fn
+        return fn
+    return register
+
+
+def _timed(fn) -> float:
+    t = time.perf_counter()
+    fn()
+    return time.perf_counter() - t
+
+
+def _best(fn, repeat: int) -> float:
+    return min(_timed(fn) for _ in range(repeat))
+
+
+def _report(label: str, seconds: float, note: str = "") -> None:
+    print(f"  {label:28s} {seconds * 1000:9.1f} ms  {note}".rstrip())
+
+
+# =========================================================
+# TABLERO SINTÉTICO
+# =========================================================
+
+_TAGS = ["API", "GAME", "DOCUMENTATION", "KNOWLEDGE", "Fiscalidad", "ORGANIZATION", "misc/sub", "x-y"]
+
+
+def synthetic_board(n_cards: int = 50_000, n_cols: int = 8, seed: int = 1) -> str:
+    """Tablero de Obsidian Kanban con wikilinks, labels, tags, fechas y comentarios."""
+    rnd = random.Random(seed)
+    out = ["---", "", "kanban-plugin: board", "", "---", ""]
+    per = n_cards // n_cols
+    for c in range(n_cols):
+        out.append("## Archive" if c == n_cols - 1 else f"## Columna {c}")
+        out.append("")
+        for i in range(per):
+            chk = "x" if rnd.random() < 0.2 else " "
+            tags = " ".join("#" + t for t in rnd.sample(_TAGS, rnd.randint(0, 4)))
+            ds = " ".join(
+                "@{2026-%02d-%02d}" % (rnd.randint(1, 12), rnd.randint(1, 28))
+                for _ in range(rnd.randint(0, 2))
+            )
+            if rnd.random() < 0.8:
+                link = f"[[Nota {rnd.randint(0, 5000)}]]" if rnd.random() < 0.7 else f"[[Nota {i}|Etiqueta {i}]]"
+            else:
+                link = f"Tarea suelta {i}"
+            if rnd.random() < 0.05:
+                out.append("%% comentario %%")
+            out.append(f"- [{chk}] {link} {tags} {ds}")
+        out.append("")
+    out.append('%% kanban:settings\n```\n{"kanban-plugin":"board"}\n```\n%%')
+    return "\n".join(out)
+
+
+def _task_lines(md: str) -> list[str]:
+    out = []
+    for line in md.splitlines():
+        t = kb_parse.TASK_RE.match(line)
+        if t:
+            out.append(t.group(2).strip())
+    return out
+
+
+# =========================================================
+# tokenizador de líneas de tarea
+# =========================================================
+
+@bench("tokenize")
+def bench_tokenize(args) -> None:
+    """tokenize_card_line (una pasada) contra la cadena de regex clásica."""
+    lines = _task_lines(synthetic_board(args.cards))
+
+    def old():
+        return [kb_parse._tokenize_card_line_slow(s) for s in lines]
+
+    def new():
+        return [kb_parse.tokenize_card_line(s) for s in lines]
+
+    assert old() == new()
+    print(f"tokenize: {len(lines)} líneas de tarea")
+    _report("varias pasadas", _best(old, args.repeat))
+    _report("una pasada", _best(new, args.repeat))
+
+
+# =========================================================
+# memoria de Card/Column frente a dicts
+# =========================================================
+
+def _parse_board_dicts(markdown: str, today: date):
+    """parse_board de antes de model.py: un dict con listas por tarjeta."""
+    md = kb_parse.strip_kanban_settings(kb_parse.strip_obsidian_comments(markdown))
+    today_o = today.toordinal()
+    columns = []
+    current = None
+    all_tags_norm = set()
+    for line in md.splitlines():
+        h = kb_parse.H2_RE.match(line)
+        if h:
+            title = h.group(1).strip()
+            current = {"title": title, "cards": [], "archived": "archiv" in title.lower()}
+            columns.append(current)
+            continue
+        if not current:
+            continue
+        t = kb_parse.TASK_RE.match(line)
+        if not t:
+            continue
+        title_txt, target, dates, tags_raw = kb_parse._tokenize_card_line_slow(t.group(2).strip())
+        tags_norm = sorted({norm_tag(x) for x in tags_raw})
+        all_tags_norm.update(tags_norm)
+        date_items = []
+        statuses_set = set()
+        dates_iso = []
+        for ds in dates:
+            ordinal = kb_dates.iso_to_ordinal(ds)
+            if ordinal is not None:
+                st = kb_dates.status_of(ordinal, today_o)
+                statuses_set.add(st)
+                dates_iso.append(ds)
+                date_items.append((ds, st))
+            else:
+                date_items.append((ds, None))
+        current["cards"].append({
+            "done": t.group(1).strip().lower() == "x",
+            "title": title_txt.strip(" -") or "(sin título)",
+            "target": target,
+            "href": None,
+            "date_items": date_items,
+            "tags": tags_raw,
+            "tags_norm": tags_norm,
+            "dates_iso": dates_iso,
+            "statuses": sorted(statuses_set),
+            "has_dates": bool(dates_iso),
+        })
+    return columns, all_tags_norm
+
+
+@bench("memory")
+def bench_memory(args) -> None:
+    """tracemalloc de parse_board: dicts con listas contra Card/Column con slots."""
+    md = synthetic_board(args.cards)
+    today = date(2026, 3, 1)
+
+    old = _parse_board_dicts(md, today)
+    new = kb_parse.parse_board(md, {}, today)
+    assert old[1] == new[1]
+    assert old[0] == [col.as_dict() for col in new[0]]
+    del old, new
+
+    print(f"memory: parse_board de {args.cards} tarjetas (tracemalloc)")
+    for label, fn in (
+        ("dicts con listas", lambda: _parse_board_dicts(md, today)),
+        ("Card/Column (slots)", lambda: kb_parse.parse_board(md, {}, today)),
+    ):
+        gc.collect()
+        tracemalloc.start()
+        res = fn()
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del res
+        print(f"  {label:28s} retenido {retained / 1e6:6.1f} MB  pico {peak / 1e6:6.1f} MB")
+
+
+# =========================================================
+# recorte de comentarios y kanban:settings
+# =========================================================
+
+def _strip_regex(md: str) -> str:
+    md = kb_parse.OBSIDIAN_COMMENT_RE.sub("", md)
+    md = kb_parse.KANBAN_SETTINGS_COMMENT_RE.sub("", md)
+    return kb_parse.KANBAN_SETTINGS_FENCE_RE.sub("", md)
+
+
+def _strip_linear(md: str) -> str:
+    return kb_parse.strip_kanban_settings(kb_parse.strip_obsidian_comments(md))
+
+
+def _strip_streaming(md: str) -> str:
+    chunks = kb_parse._iter_without_comments(kb_parse._iter_chunks(md))
+    return "".join(kb_parse._iter_without_settings_fences(kb_parse._iter_without_settings_comments(chunks)))
+
+
+def _pathological(n: int) -> dict[str, str]:
+    return {
+        "%% sin cerrar + fences": "%% kanban:settings\n" + "```\ncode\n```\n" * n,
+        "fences, sin settings": "```\ncode\n```\n- [ ] x\n" * n,
+        "fences + settings al final": "```\ncode\n```\n- [ ] x\n" * n + "kanban:settings",
+        "candidatos %%": "%%x\n" * (2 * n),
+        "``` y luego tareas": "```\n" + "- [ ] task #t @{2024-01-01}\n" * (10 * n),
+    }
+
+
+@bench("strip")
+def bench_strip(args) -> None:
+    """
+    Máquinas de estados contra las regex DOTALL en entradas patológicas. Las
+    regex son cuadráticas: se miden con --fences (por defecto 5000) y las
+    máquinas también con 4x, que debería tardar ~4x.
+    """
+    n = args.fences
+    small, big = _pathological(n), _pathological(4 * n)
+    print(f"strip: entradas patológicas (n={n}; máquinas también con 4n)")
+    for name, md in small.items():
+        t = time.perf_counter()
+        expected = _strip_regex(md)
+        t_regex = time.perf_counter() - t
+        assert _strip_linear(md) == expected and _strip_streaming(md) == expected
+        print(f"  {name} ({len(md) // 1024} KB)")
+        _report("regex", t_regex)
+        _report("lineal", _best(lambda: _strip_linear(md), args.repeat))
+        _report("streaming", _best(lambda: _strip_streaming(md), args.repeat))
+        md4 = big[name]
+        _report("lineal 4n", _best(lambda: _strip_linear(md4), args.repeat))
+        _report("streaming 4n", _best(lambda: _strip_streaming(md4), args.repeat))
+
+
+# =========================================================
+# urls relativas en páginas de índice
+# =========================================================
+
+@bench("urls")
+def bench_urls(args) -> None:
+    """
+    get_relative_url de mkdocs contra urls.py en un sitio con muchas páginas
+    de índice (--index-pages páginas x --index-entries entradas en 60 carpetas),
+    con y sin use_directory_urls.
+    """
+    from mkdocs.utils import _norm_parts, get_relative_url
+
+    n_pages, n_entries = args.index_pages, args.index_entries
+    print(f"urls: {n_pages} páginas de índice x {n_entries} entradas")
+    for dir_urls in (True, False):
+        ext = "/" if dir_urls else ".html"
+        entries = [f"Research/Developments/sub{i % 60}/Note {i}{ext}" for i in range(n_entries)]
+        pages = [f"Research/Developments/sub{k % 60}/idx{k}{ext}" for k in range(n_pages)]
+
+        def old():
+            _norm_parts.cache_clear()
+            return [get_relative_url(u, p) for p in pages for u in entries]
+
+        def per_page():
+            kb_registry.reset_build()
+            out = []
+            for p in pages:
+                rel = kb_urls.for_page(p)
+                out.extend([rel(u) for u in entries])
+            return out
+
+        def per_call():
+            kb_registry.reset_build()
+            return [kb_urls.relative_url(u, p) for p in pages for u in entries]
+
+        assert old() == per_page() == per_call()
+        print(f"  use_directory_urls={dir_urls}")
+        _report("get_relative_url", _best(old, args.repeat))
+        _report("urls.for_page", _best(per_page, args.repeat))
+        _report("urls.relative_url", _best(per_call, args.repeat))
+
+
+# =========================================================
+# clasificación de rutas por roots
+# =========================================================
+
+@bench("classify")
+def bench_classify(args) -> None:
+    """PathClassifier (trie) contra los bucles de prefijos/subcadenas de dir_index."""
+    groups = {
+        "Developments": ["research/Developments", "Developments"],
+        "Archived": ["research/Archived", "Archived"],
+        "dev": ["research/Developments", "Developments", "research"],
+        "arch": ["research/Archived", "Archived", "research/archived"],
+    }
+    rnd = random.Random(0)
+    dirs = ["Research", "Developments", "Archived", "notas", "2024", "Proyecto X", "docs", "research"]
+    paths = [
+        "/".join(rnd.choice(dirs) for _ in range(rnd.randint(1, 5))) + f"/nota {i}.md"
+        for i in range(args.paths)
+    ]
+
+    # lo de antes (dir_index._starts_with_any): por ruta, cada root se normaliza
+    # y se prueba al principio y como subcadena
+    def starts_with_any(src_path: str, roots: list[str]) -> bool:
+        sp_l = (src_path or "").replace("\\", "/").strip("/").lower()
+        for r in roots:
+            rr_l = (r or "").replace("\\", "/").strip("/").lower()
+            if rr_l and (sp_l == rr_l or sp_l.startswith(rr_l + "/") or f"/{rr_l}/" in f"/{sp_l}/"):
+                return True
+        return False
+
+    def old():
+        return [tuple(g for g, roots in groups.items() if starts_with_any(p, roots)) for p in paths]
+
+    classifier = kb_paths.from_groups(groups, anywhere=True)
+
+    def new():
+        return [classifier.match(p) for p in paths]
+
+    assert old() == new()
+    print(f"classify: {len(paths)} rutas x {len(groups)} grupos")
+    _report("prefijos/subcadenas", _best(old, args.repeat))
+    _report("trie", _best(new, args.repeat))
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description="Micro-benchmarks de los hooks")
+    ap.add_argument("names", nargs="*", metavar="bench",
+                    help=f"cuáles ejecutar (por defecto todos): {', '.join(BENCHES)}")
+    ap.add_argument("--cards", type=int, default=50_000, help="tarjetas del tablero sintético")
+    ap.add_argument("--fences", type=int, default=5000, help="tamaño de las entradas patológicas de strip")
+    ap.add_argument("--index-pages", type=int, default=300, help="páginas de índice del bench urls")
+    ap.add_argument("--index-entries", type=int, default=3000, help="entradas por página de índice")
+    ap.add_argument("--paths", type=int, default=20_000, help="rutas del bench classify")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args(argv)
+    unknown = [n for n in args.names if n not in BENCHES]
+    if unknown:
+        ap.error(f"no existe: {', '.join(unknown)}")
+    for name in args.names or BENCHES:
+        BENCHES[name](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import gc
+import hashlib
+import json
+import os
+import time
+from datetime import date
+from pathlib import Path
+
+import dates as kb_dates
+import parse as kb_parse
+from model import Column
+
+# Caché en disco de tableros ya parseados: .cache/kanban/<sha256>.json
+# La clave es el markdown + PARSER_VERSION + opciones del parseo. Los status de
+# las fechas NO se guardan (dependen del día): se guardan los ordinales y se
+# recalculan al leer.
+CACHE_SUBDIR = Path(".cache") / "kanban"
+MAX_AGE_DAYS = 30
+MAX_TOTAL_BYTES = 64 * 1024 * 1024
+
+
+def cache_dir(config) -> Path | None:
+    cfg_path = config.get("config_file_path") if config else None
+    if not cfg_path:
+        return None
+    return Path(cfg_path).resolve().parent / CACHE_SUBDIR
+
+
+def cache_key(markdown: str, page_meta: dict, allowed_tags: set[str] | None, archive_keyword: str) -> str:
+    h = hashlib.sha256()
+    h.update(f"v{kb_parse.PARSER_VERSION}\0{archive_keyword}\0".encode())
+    h.update(json.dumps(sorted(allowed_tags) if allowed_tags is not None else None).encode())
+    h.update(b"\0board\0" if (page_meta or {}).get("kanban-plugin") == "board" else b"\0\0")
+    h.update(markdown.encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+
+def _load(path: Path) -> list | None:
+    # json.loads crea miles de listas pequeñas: sin pausar el GC, la mayor parte
+    # del tiempo se va en recolecciones que no liberan nada
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        records = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    finally:
+        if gc_enabled:
+            gc.enable()
+    if not isinstance(records, list) or not _valid(records):
+        return None
+    try:
+        os.utime(path)  # refresca la edad: lo que se usa no se expulsa
+    except OSError:
+        pass
+    return records
+
+
+def _valid(records: list) -> bool:
+    """
+    ¿Tienen los registros la forma que escribe iter_board? Un fichero cortado o
+    editado a mano se trata como si no estuviera (se vuelve a parsear y se
+    reescribe) en vez de romper el build a mitad del tablero.
+    """
+    in_column = False
+    for rec in records:
+        if type(rec) is not list or not rec:
+            return False
+        kind = rec[0]
+        if kind == "k":
+            # las tarjetas siempre van detrás de su columna
+            if not in_column or len(rec) != 7:
+                return False
+            _, done, title, target, dated, tags, tags_norm = rec
+            if type(done) is not bool or type(title) is not str or (target is not None and type(target) is not str):
+                return False
+            if type(dated) is not list or type(tags) is not list or type(tags_norm) is not list:
+                return False
+            for d in dated:
+                if type(d) is not list or len(d) != 2 or type(d[0]) is not str or (d[1] is not None and type(d[1]) is not int):
+                    return False
+            for t in tags:
+                if type(t) is not str:
+                    return False
+            for t in tags_norm:
+                if type(t) is not str:
+                    return False
+        elif kind == "c":
+            if len(rec) != 3 or type(rec[1]) is not str or type(rec[2]) is not bool:
+                return False
+            in_column = True
+        else:
+            return False
+    return True
+
+
+def _store(path: Path, records: list) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(records, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def _replay(records: list):
+    for rec in records:
+        if rec[0] == "c":
+            yield "column", Column(title=rec[1], archived=rec[2], cards=[])
+        else:
+            done, title, target, dated, tags, tags_norm = rec[1:]
+            yield "card", (done, title, target, dated, tags, tags_norm)
+
+
+def iter_board(
+    markdown: str,
+    page_meta: dict,
+    today: date,
+    *,
+    config,
+    allowed_tags: set[str] | None = None,
+    archive_keyword: str = "archiv",
+):
+    """
+    Igual que parse.iter_board, pero si el tablero ya se parseó en otro build
+    (mismo contenido y misma versión del parser) se lee de la caché en disco.
+    La caché solo se escribe si se consume el tablero entero.
+    """
+    base = cache_dir(config)
+    if base is None:
+        yield from kb_parse.iter_board(
+            markdown, page_meta, today, allowed_tags=allowed_tags, archive_keyword=archive_keyword
+        )
+        return
+
+    path = base / f"{cache_key(markdown, page_meta, allowed_tags, archive_keyword)}.json"
+    records = _load(path)
+    if records is not None:
+        yield from kb_parse.cards_from_tokens(_replay(records), today)
+        return
+
+    records = []
+    statuses = kb_dates.status_table(today.toordinal())
+    events = kb_parse.iter_board_tokens(
+        markdown, page_meta, allowed_tags=allowed_tags, archive_keyword=archive_keyword
+    )
+    for kind, item in events:
+        if kind == "column":
+            records.append(["c", item.title, item.archived])
+            yield kind, item
+        else:
+            records.append(["k", *item])
+            yield kind, kb_parse.card_from_tokens(*item, statuses)
+
+    _store(path, records)
+
+
+def prune(config, *, max_age_days: int = MAX_AGE_DAYS, max_total_bytes: int = MAX_TOTAL_BYTES) -> None:
+    """Expulsa entradas viejas y, si aún ocupa demasiado, las menos usadas."""
+    base = cache_dir(config)
+    if base is None or not base.is_dir():
+        return
+
+    now = time.time()
+    entries = []
+    for p in base.iterdir():
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        age = now - st.st_mtime
+        if age > max_age_days * 86400 or (p.suffix == ".tmp" and age > 3600):
+            try:
+                p.unlink()
+            except OSError:
+                pass
+            continue
+        entries.append((st.st_mtime, st.st_size, p))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, p in sorted(entries, key=lambda e: e[0]):
+        if total <= max_total_bytes:
+            break
+        try:
+            p.unlink()
+            total -= size
+        except OSError:
+            pass
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import os
+import weakref
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterable
+
+# Registro único de las cachés en memoria de los hooks.
+#
+# - cache(name):        dict por build (se vacía en reset_build), opcionalmente LRU
+# - files_cache(name):  valores por objeto `Files`, con referencia débil a él:
+#                       al cambiar de build el Files viejo se libera y su entrada
+#                       desaparece (y nunca se confunde con otro por id reciclado)
+# - file_value(name):   valor cargado de uno o varios ficheros (tag_colors.json...)
+#                       que se recarga si cambian su mtime/tamaño; se comprueba
+#                       una vez por build
+#
+# reset_build() va en on_pre_build y shutdown() en on_shutdown.
+
+_MISSING = object()
+
+_CACHES: dict[str, "BuildCache | FilesCache | FileValue"] = {}
+_GENERATION = 0     # sube en cada reset_build()
+
+
+class BuildCache:
+    """Dict con nombre, contadores y tamaño máximo opcional (LRU)."""
+
+    def __init__(self, name: str, maxsize: int | None = None):
+        self.name = name
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default=None):
+        value = self._data.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        if self.maxsize is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value) -> None:
+        self._data[key] = value
+        if self.maxsize is not None:
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], object]):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self[key] = value
+        return value
+
+    def values(self) -> list:
+        return list(self._data.values())
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return _stats(self.name, len(self), self.maxsize, self.hits, self.misses)
+
+
+class FilesCache:
+    """
+    Un valor por objeto `Files` (por identidad), con referencia débil a la
+    clave. Los valores no deben guardar una referencia fuerte al Files.
+    """
+
+    def __init__(self, name: str, maxsize: int = 2):
+        self.name = name
+        self.maxsize = maxsize
+        self._data: OrderedDict[int, tuple[weakref.ref, object]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_create(self, files, factory: Callable[[], object]):
+        key = id(files)
+        item = self._data.get(key)
+        if item is not None and item[0]() is files:
+            self.hits += 1
+            self._data.move_to_end(key)
+            return item[1]
+
+        self.misses += 1
+        value = factory()
+        data = self._data
+
+        def _drop(_ref, key=key):
+            cur = data.get(key)
+            if cur is not None and cur[0] is _ref:
+                del data[key]
+
+        data[key] = (weakref.ref(files, _drop), value)
+        data.move_to_end(key)
+        while len(data) > self.maxsize:
+            data.popitem(last=False)
+        return value
+
+    def last(self):
+        """El valor usado más recientemente (o None)."""
+        if not self._data:
+            return None
+        return next(reversed(self._data.values()))[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return _stats(self.name, len(self), self.maxsize, self.hits, self.misses)
+
+
+class FileValue:
+    """Valor derivado de unos ficheros; se recarga si cambia alguno (o aparece/desaparece)."""
+
+    def __init__(self, name: str, paths: Iterable[os.PathLike | str], loader: Callable[[], object]):
+        self.name = name
+        self.paths = [os.fspath(p) for p in paths]
+        self.loader = loader
+        self._value = _MISSING
+        self._signature = None
+        self._checked = -1
+        self.hits = 0
+        self.misses = 0
+
+    def _current_signature(self) -> tuple:
+        sig = []
+        for p in self.paths:
+            try:
+                st = os.stat(p)
+            except OSError:
+                sig.append(None)
+            else:
+                sig.append((st.st_mtime_ns, st.st_size))
+        return tuple(sig)
+
+    def get(self):
+        if self._value is not _MISSING and self._checked == _GENERATION:
+            self.hits += 1
+            return self._value
+        sig = self._current_signature()
+        self._checked = _GENERATION
+        if self._value is not _MISSING and sig == self._signature:
+            self.hits += 1
+            return self._value
+        self.misses += 1
+        self._value = self.loader()
+        self._signature = sig
+        return self._value
+
+    def clear(self) -> None:
+        self._value = _MISSING
+        self._signature = None
+
+    def __len__(self) -> int:
+        return 0 if self._value is _MISSING else 1
+
+    def stats(self) -> dict:
+        return _stats(self.name, len(self), 1, self.hits, self.misses)
+
+
+def _stats(name: str, size: int, maxsize: int | None, hits: int, misses: int) -> dict:
+    total = hits + misses
+    return {
+        "name": name,
+        "size": size,
+        "maxsize": maxsize,
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total, 3) if total else None,
+    }
+
+
+def _register(name: str, factory):
+    cache = _CACHES.get(name)
+    if cache is None:
+        cache = _CACHES[name] = factory()
+    return cache
+
+
+def cache(name: str, maxsize: int | None = None) -> BuildCache:
+    return _register(name, lambda: BuildCache(name, maxsize))
+
+
+def files_cache(name: str, maxsize: int = 2) -> FilesCache:
+    return _register(name, lambda: FilesCache(name, maxsize))
+
+
+def file_value(name: str, paths: Iterable[os.PathLike | str], loader: Callable[[], object]) -> FileValue:
+    return _register(name, lambda: FileValue(name, paths, loader))
+
+
+def reset_build() -> None:
+    """Para on_pre_build: vacía lo que es de un build y obliga a revisar los ficheros."""
+    global _GENERATION
+    _GENERATION += 1
+    for c in _CACHES.values():
+        if not isinstance(c, FileValue):
+            c.clear()
+
+
+def shutdown() -> None:
+    """Para on_shutdown: suelta todo."""
+    global _GENERATION
+    _GENERATION += 1
+    for c in _CACHES.values():
+        c.clear()
+
+
+def stats() -> list[dict]:
+    return [c.stats() for c in _CACHES.values()]
@@ -1,6 +1,14 @@
 # hooks/obsidian_callouts.py
 from __future__ import annotations
 import re
+import sys
+from pathlib import Path
+
+_THIS_DIR = Path(__file__).resolve().parent
+if str(_THIS_DIR) not in sys.path:
+    sys.path.insert(0, str(_THIS_DIR))
+
+import page_scan  # noqa: E402
 
 # > [!note] Title
 # > content
@@ -23,6 +31,9 @@ def _escape_title(s: str) -> str:
 
 
 def on_page_markdown(markdown, page, config, files, **kwargs):
+    if not page_scan.scan_page(markdown, page).callouts:
+        return markdown
+
     lines = (markdown or "").splitlines()
     out = []
     i = 0
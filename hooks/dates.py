@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Iterable
+from zoneinfo import ZoneInfo
+
+# Capa de fechas compartida por parse.py y dir_index.py (y por
+# indexer.collect_index_entries, que ningún hook llama).
+# Las fechas se manejan como ordinales (date.toordinal()) y el "hoy" se calcula
+# una sola vez por build (reset_today() desde on_pre_build).
+#
+# Con `extra: kanban: client_date_status: true` en mkdocs.yml el html no lleva
+# los status: solo el día de cada fecha (días desde 1970-01-01, lo mismo que
+# KbFilter.dayOf en el navegador) y el script calcula past/soon/later con el
+# "hoy" de Europe/Madrid del que mira la página. Así el html solo depende del
+# contenido y no cambia de un día para otro.
+
+TZ_MADRID = ZoneInfo("Europe/Madrid")
+
+# ordinal de 1970-01-01: ordinal - UNIX_EPOCH_ORDINAL = día para el navegador
+UNIX_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+CLIENT_STATUS_KEY = "client_date_status"
+
+_TODAY: int | None = None
+_STATUS_TABLES: dict[int, "StatusTable"] = {}
+
+
+@lru_cache(maxsize=8192)
+def iso_to_ordinal(ds: str) -> int | None:
+    """'YYYY-MM-DD' -> ordinal. None si no es una fecha válida."""
+    # camino rápido: posiciones fijas, sin strptime
+    if len(ds) == 10 and ds[4] == "-" and ds[7] == "-":
+        y, m, d = ds[0:4], ds[5:7], ds[8:10]
+        # como strptime: el año admite cualquier dígito, mes y día solo ASCII
+        if y.isdecimal() and (m + d).isascii() and m.isdigit() and d.isdigit():
+            try:
+                return date(int(y), int(m), int(d)).toordinal()
+            except ValueError:
+                return None
+    try:
+        return datetime.strptime(ds, "%Y-%m-%d").toordinal()
+    except Exception:
+        return None
+
+
+def today_ordinal() -> int:
+    """Hoy en Europe/Madrid, calculado una vez por build."""
+    global _TODAY
+    if _TODAY is None:
+        _TODAY = datetime.now(TZ_MADRID).date().toordinal()
+    return _TODAY
+
+
+def today() -> date:
+    return date.fromordinal(today_ordinal())
+
+
+def reset_today() -> None:
+    global _TODAY
+    _TODAY = None
+    _STATUS_TABLES.clear()
+
+
+def client_status(config) -> bool:
+    """¿Status de las fechas en el navegador? (extra.kanban.client_date_status)"""
+    extra = (config.get("extra") if config else None) or {}
+    kanban = extra.get("kanban") or {}
+    return bool(kanban.get(CLIENT_STATUS_KEY, False)) if isinstance(kanban, dict) else False
+
+
+def epoch_day(ordinal: int) -> int:
+    return ordinal - UNIX_EPOCH_ORDINAL
+
+
+def epoch_days_for_isos(dates_iso: Iterable[str]) -> list[int]:
+    """Días (desde 1970-01-01) de las fechas ISO válidas, en orden."""
+    out = []
+    for ds in dates_iso:
+        ordinal = iso_to_ordinal(ds)
+        if ordinal is not None:
+            out.append(ordinal - UNIX_EPOCH_ORDINAL)
+    return out
+
+
+def status_of(due: int, today: int) -> str:
+    if due < today:
+        return "past"
+    if due - today < 7:
+        return "soon"
+    return "later"
+
+
+class StatusTable(dict):
+    """ordinal -> status para un "hoy" fijo; cada fecha distinta se clasifica una vez."""
+
+    __slots__ = ("today",)
+
+    def __init__(self, today: int):
+        super().__init__()
+        self.today = today
+
+    def __missing__(self, due: int) -> str:
+        st = self[due] = status_of(due, self.today)
+        return st
+
+
+def status_table(today: int | None = None) -> StatusTable:
+    if today is None:
+        today = today_ordinal()
+    table = _STATUS_TABLES.get(today)
+    if table is None:
+        table = _STATUS_TABLES[today] = StatusTable(today)
+    return table
+
+
+def statuses_for_isos(dates_iso: Iterable[str], today: int | None = None) -> list[str]:
+    """Status distintos (ordenados) de una lista de fechas ISO."""
+    table = status_table(today)
+    out = set()
+    for ds in dates_iso:
+        ordinal = iso_to_ordinal(ds)
+        if ordinal is not None:
+            out.add(table[ordinal])
+    return sorted(out)
@@ -1,13 +1,30 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import posixpath
 import re
+import sys
 from dataclasses import dataclass
-from datetime import datetime, date
+from datetime import date
+from html import escape as html_escape
 from pathlib import Path
-from zoneinfo import ZoneInfo
 
-from mkdocs.utils import get_relative_url
+from mkdocs.structure.files import File
+
+_THIS_DIR = Path(__file__).resolve().parent
+if str(_THIS_DIR) not in sys.path:
+    sys.path.insert(0, str(_THIS_DIR))
+
+import dates as kb_dates  # noqa: E402
+import page_scan  # noqa: E402
+import cache_registry as kb_registry  # noqa: E402
+from script import FILTER_ENGINE_SCRIPT  # noqa: E402
+import static_assets as kb_assets  # noqa: E402
+import urls as kb_urls  # noqa: E402
+import doc_meta as kb_meta  # noqa: E402
+import path_classifier as kb_paths  # noqa: E402
+import search_index as kb_search  # noqa: E402
 
 
 # =========================================================
@@ -39,76 +56,59 @@ GROUP_ALIASES = {
     "archive": "Archived",
 }
 
+# Modo por trozos: con más de SHARD_MIN_ENTRIES notas (o con
+# `dirindex-shards: true` en el front matter del index.md) las entradas van en
+# ficheros JSON de SHARD_SIZE junto a la página; el html solo trae la primera
+# página y el navegador carga el resto al hacer scroll o al filtrar.
+# `dirindex-shards: false` lo apaga aunque el grupo sea grande.
+SHARDS_META_KEY = "dirindex-shards"
+SHARD_SIZE = 200
+SHARD_MIN_ENTRIES = 1000
+SHARD_STATUSES = ("later", "past", "soon")
+_SHARD_STATUS_IDS = {st: i for i, st in enumerate(SHARD_STATUSES)}
 
-
-# =========================================================
-# PARSE HELPERS (tags/fechas/título)
-# =========================================================
-
-H1_RE = re.compile(r"^#\s+(.+?)\s*$", re.M)
-TAG_RE = re.compile(r"(?<!\w)#([\w\-_/]+)")
-DATE_RE = re.compile(r"@\{(\d{4}-\d{2}-\d{2})\}")
+# Buscador: el índice invertido de cada grupo (título + texto de las notas, ver
+# search_index.py) va en un JSON aparte que el navegador pide al empezar a
+# escribir. Es el mismo para todas las páginas del grupo.
+SEARCH_DIR = f"{kb_assets.ASSETS_DIR}/dirindex-search"
 
 
-def _today_madrid() -> date:
-    return datetime.now(ZoneInfo("Europe/Madrid")).date()
-
-
-def _parse_date_iso(ds: str) -> date | None:
-    try:
-        y, m, d = ds.split("-")
-        return date(int(y), int(m), int(d))
-    except Exception:
-        return None
-
-
-def _date_status(due: date, today: date) -> str:
-    if due < today:
-        return "past"
-    delta = (due - today).days
-    if delta < 7:
-        return "soon"
-    return "later"
 
+# =========================================================
+# PARSE HELPERS (tags)
+# =========================================================
+# El título/tags/fechas de cada nota salen de doc_meta.py: de la propia página
+# leída por mkdocs (on_page_markdown) y, si faltara alguna, del almacén SQLite.
 
 def _norm_tag(tag: str) -> str:
     return tag.strip().lstrip("#").upper()
 
 
-def _read_text_safe(abs_path: str) -> str:
-    try:
-        return Path(abs_path).read_text(encoding="utf-8", errors="ignore")
-    except Exception:
-        return ""
-
-
-def _title_from_md(text: str, fallback: str) -> str:
-    m = H1_RE.search(text)
-    if m:
-        return m.group(1).strip()
-    return fallback
-
-
 # =========================================================
 # TAG COLORS (reusa tu JSON si existe)
 # =========================================================
 
+_TAG_COLORS_CANDIDATES = [
+    Path(__file__).resolve().parent.parent / "obsidian_kanban" / "tag_colors.json",
+    Path(__file__).resolve().parent.parent / "tag_colors.json",
+]
+
+
 def _load_tag_colors() -> dict:
     """
     Intenta cargar tag_colors.json desde:
       - hooks/obsidian_kanban/tag_colors.json
       - hooks/tag_colors.json
+    (cacheado; se recarga si alguno de los dos cambia)
     """
+    return _TAG_COLORS.get()
+
+
+def _read_tag_colors() -> dict:
     # defaults
     raw = {"__default__": {"bg": "#8080801a", "fg": "#cfcfcf"}}
 
-    here = Path(__file__).resolve().parent  # hooks/dir_index
-    candidates = [
-        here.parent / "obsidian_kanban" / "tag_colors.json",
-        here.parent / "tag_colors.json",
-    ]
-
-    for p in candidates:
+    for p in _TAG_COLORS_CANDIDATES:
         if p.exists():
             try:
                 data = json.loads(p.read_text(encoding="utf-8"))
@@ -129,6 +129,9 @@ def _load_tag_colors() -> dict:
     return normalized
 
 
+_TAG_COLORS = kb_registry.file_value("dir_index.tag_colors", _TAG_COLORS_CANDIDATES, _read_tag_colors)
+
+
 def _tag_style(tag_colors: dict, tag: str) -> str:
     cfg = tag_colors.get(_norm_tag(tag), tag_colors.get("__default__", {"bg": "#8080801a", "fg": "#cfcfcf"}))
     bg = cfg.get("bg", "#8080801a")
@@ -150,98 +153,116 @@ class Entry:
     statuses: list[str]
     has_dates: bool
     rel_src: str
-
-def _starts_with_any(src_path: str, roots: list[str]) -> bool:
-    sp = (src_path or "").replace("\\", "/").strip("/")
-    sp_l = sp.lower()
-    sp_bound = "/" + sp_l + "/"
-
-    for r in roots:
-        rr = (r or "").replace("\\", "/").strip("/")
-        if not rr:
-            continue
-        rr_l = rr.lower()
-
-        # match normal al inicio
-        if sp_l == rr_l or sp_l.startswith(rr_l + "/"):
-            return True
-
-        # match si hay prefijo extra (ej: "docs/") pero respetando fronteras
-        if f"/{rr_l}/" in sp_bound:
-            return True
-
-    return False
+    words: tuple[str, ...]      # para el índice de texto del grupo
+
+
+# grupo -> [(url, Entry sin href)] del build actual
+_GROUPS = kb_registry.files_cache("dir_index.groups")
+# src_uri -> página con marcador, pendiente de rellenar en on_env
+_PENDING = kb_registry.cache("dir_index.pending")
+# grupo -> File del índice de texto del build actual
+_SEARCH = kb_registry.files_cache("dir_index.search")
+
+# GROUP_ROOTS compilado: un root casa al principio de la ruta o con algún
+# prefijo delante (ej: "docs/"), respetando los límites de carpeta
+_GROUP_PATHS = kb_paths.from_groups(GROUP_ROOTS, anywhere=True)
+
+
+def _base_entry(sp: str, meta, allowed_tags: set[str], today: date) -> Entry:
+    title = meta.title if meta and meta.title is not None else Path(sp).stem
+
+    # tags
+    tags_raw = list(meta.tags) if meta else []  # sin '#'
+    tags_norm_all = sorted({_norm_tag(t) for t in tags_raw})
+    tags_norm = [t for t in tags_norm_all if t in allowed_tags]
+    tags_display = [t for t in tags_raw if _norm_tag(t) in allowed_tags]
+
+    # fechas
+    dates_iso = list(meta.dates_iso) if meta else []
+
+    # palabras (las de meta ya incluyen el título si viene de la nota)
+    words = (meta.words or ()) if meta else ()
+    if meta is None or meta.title is None:
+        words = kb_search.merge(kb_search.words(title), words)
+
+    return Entry(
+        title=title,
+        href="",    # depende de la página: se pone en _collect_entries
+        tags_norm=tags_norm,
+        tags_display=tags_display,
+        dates_iso=dates_iso,
+        statuses=kb_dates.statuses_for_isos(dates_iso, today.toordinal()),
+        has_dates=bool(dates_iso),
+        rel_src=sp,
+        words=words,
+    )
 
 
+def _classify(files, config, allowed_tags: set[str], today: date) -> dict[str, list[tuple[str, Entry]]]:
+    """
+    Una pasada por todas las notas del build: cada una va a los grupos de
+    GROUP_ROOTS en los que cae, como (url, Entry sin href), ordenadas por título.
+    """
+    groups: dict[str, list[tuple[str, Entry]]] = {g: [] for g in GROUP_ROOTS}
 
-def _collect_entries(files, page, group_name: str, allowed_tags: set[str], today: date) -> list[Entry]:
-    roots = GROUP_ROOTS.get(group_name, [])
-    if not roots:
-        return []
+    for doc in kb_meta.get_documents(files, config):
+        sp = doc.src_uri.lstrip("/")
+        sp_l = sp.lower()
 
-    out: list[Entry] = []
+        # ✅ SOLO .md, y sin los index.md (cualquier index.md dentro del árbol)
+        if not sp_l.endswith(".md") or sp_l.endswith("/index.md"):
+            continue
 
-    for f in files.documentation_pages():
-        src_path = getattr(f, "src_path", "") or ""
-        abs_src_path = getattr(f, "abs_src_path", "") or ""
-        url = getattr(f, "url", None)
-        if not url or not src_path or not abs_src_path:
+        matched = _GROUP_PATHS.match(sp)
+        if not matched:
             continue
 
-        sp = src_path.replace("\\", "/").lstrip("/")
+        entry = _base_entry(sp, doc.meta, allowed_tags, today)
+        for g in matched:
+            groups[g].append((doc.url, entry))
 
-        # ✅ SOLO .md
-        if not sp.lower().endswith(".md"):
-            continue
+    # orden por título
+    for items in groups.values():
+        items.sort(key=lambda it: it[1].title.lower())
+    return groups
 
-        # ✅ EXCLUIR index.md (cualquier index.md dentro del árbol)
-        if sp.lower().endswith("/index.md"):
-            continue
 
-        if not _starts_with_any(sp, roots):
-            continue
+def _group_index(files, config, allowed_tags: set[str], today: date) -> dict[str, list[tuple[str, Entry]]]:
+    """Los grupos del build actual (uno por objeto Files); se monta en on_env."""
+    return _GROUPS.get_or_create(files, lambda: _classify(files, config, allowed_tags, today))
 
-        # Evitar index.md del propio folder si quieres (opcional)
-        if sp.lower().endswith("/index.md"):
-            # lo dejamos en el índice si quieres; normalmente NO lo listamos
-            continue
 
-        text = _read_text_safe(abs_src_path)
-        fallback_title = Path(sp).stem
-        title = _title_from_md(text, fallback_title)
-
-        # tags
-        tags_raw = TAG_RE.findall(text) or []  # sin '#'
-        tags_norm_all = sorted({_norm_tag(t) for t in tags_raw})
-        tags_norm = [t for t in tags_norm_all if t in allowed_tags]
-        tags_display = [t for t in tags_raw if _norm_tag(t) in allowed_tags]
-
-        # fechas
-        dates_iso = [d.strip() for d in DATE_RE.findall(text) or []]
-        statuses_set = set()
-        for ds in dates_iso:
-            d = _parse_date_iso(ds)
-            if d:
-                statuses_set.add(_date_status(d, today))
-
-        href = get_relative_url(url, page.url)
-
-        out.append(
-            Entry(
-                title=title,
-                href=href,
-                tags_norm=tags_norm,
-                tags_display=tags_display,
-                dates_iso=dates_iso,
-                statuses=sorted(statuses_set),
-                has_dates=bool(dates_iso),
-                rel_src=sp,
-            )
-        )
+def _collect_entries(files, page, group_name: str, allowed_tags: set[str], today: date, config=None) -> list[Entry]:
+    """Las entradas del grupo con el href relativo a `page` (lo único que depende de la página)."""
+    items = _group_index(files, config, allowed_tags, today).get(group_name, [])
+    relative = kb_urls.for_page(page.url)
+    return [
+        Entry(e.title, relative(url), e.tags_norm, e.tags_display, e.dates_iso, e.statuses, e.has_dates, e.rel_src, e.words)
+        for url, e in items
+    ]
 
-    # orden por título
-    out.sort(key=lambda e: e.title.lower())
-    return out
+
+def _search_file(files, config, group_name: str, allowed_tags: set[str], today: date) -> File | None:
+    """
+    El JSON con el índice de texto del grupo (se monta y se añade a files una
+    vez por build). Los ids son las posiciones en el listado del grupo, que
+    es el mismo orden en todas las páginas.
+    """
+    per_group = _SEARCH.get_or_create(files, dict)
+    if group_name not in per_group:
+        items = _group_index(files, config, allowed_tags, today).get(group_name, [])
+        f = None
+        if items:
+            index = kb_search.build([e.words for _, e in items])
+            content = json.dumps(index, ensure_ascii=False, separators=(",", ":"))
+            digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:10]
+            src_uri = f"{SEARCH_DIR}/{group_name.lower()}.{digest}.json"
+            f = files.get_file_from_path(src_uri)
+            if f is None:
+                f = File.generated(config, src_uri, content=content)
+                files.append(f)
+        per_group[group_name] = f
+    return per_group[group_name]
 
 
 # =========================================================
@@ -376,6 +397,13 @@ DIRINDEX_STYLE = r"""
   padding:.9rem 0;
 }
 
+.di-more{
+  opacity:.6;
+  text-align:center;
+  padding:.6rem 0;
+  font-size:.84rem;
+}
+
 .di-hidden{ display:none !important; }
 </style>
 """
@@ -384,7 +412,7 @@ DIRINDEX_SCRIPT = r"""
 <script>
 (function(){
   const wrap = document.querySelector('[data-di-wrap="1"]');
-  if(!wrap) return;
+  if(!wrap || !window.KbFilter) return;
 
   const qEl = wrap.querySelector('[data-di-filter="q"]');
   const statusEl = wrap.querySelector('[data-di-filter="status"]');
@@ -396,63 +424,49 @@ DIRINDEX_SCRIPT = r"""
 
   const activeTags = new Set();
 
-  function norm(s){ return (s||"").toString().trim().toLowerCase(); }
-
-  function parseISO(d){
-    if(!d) return null;
-    const m = /^(\d{4})-(\d{2})-(\d{2})$/.exec(d);
-    if(!m) return null;
-    return new Date(Number(m[1]), Number(m[2]) - 1, Number(m[3])).getTime();
+  // buscador de texto (DIRINDEX_SEARCH_SCRIPT): el índice del grupo se pide al
+  // entrar en el buscador; hasta que llega, "q" filtra por título como siempre
+  const searchUrl = wrap.getAttribute('data-di-search');
+  let search = null;
+  let searchLoad = null;
+
+  function loadSearch(){
+    if(searchLoad || !searchUrl || !window.KbDirSearch) return;
+    searchLoad = fetch(searchUrl)
+      .then(r => {
+        if(!r.ok) throw new Error(`${r.status} ${searchUrl}`);
+        return r.json();
+      })
+      .then(data => {
+        search = window.KbDirSearch.create(data);
+        if(qEl && qEl.value) apply();
+      })
+      .catch(err => console.warn('dirindex:', err));
   }
 
-  function anyDateInRange(dates, fromTs, toTs){
-    for(const ds of dates){
-      const ts = parseISO(ds);
-      if(ts === null) continue;
-      if(fromTs !== null && ts < fromTs) continue;
-      if(toTs !== null && ts > toTs) continue;
-      return true;
-    }
-    return false;
+  // índice grande: las entradas vienen en trozos JSON (DIRINDEX_SHARDS_SCRIPT)
+  const island = wrap.querySelector('script[data-di-data]');
+  const engine = (island && window.KbDirShards)
+    ? window.KbDirShards.create(wrap, JSON.parse(island.textContent))
+    : window.KbFilter.create({
+      groups: [{ items: cards, empty: empty }],
+      hiddenClass: 'di-hidden',
+      fields: { tags: 'data-tags' },
+    });
+
+  function filterState(){
+    return {
+      q: qEl && qEl.value,
+      status: (statusEl && statusEl.value) ? statusEl.value : "",
+      from: fromEl ? fromEl.value : "",
+      to: toEl ? toEl.value : "",
+      tags: activeTags,
+      match: (search && qEl) ? search.query(qEl.value) : null,
+    };
   }
 
   function apply(){
-    const q = norm(qEl && qEl.value);
-    const status = (statusEl && statusEl.value) ? statusEl.value : "";
-    const fromTs = fromEl && fromEl.value ? parseISO(fromEl.value) : null;
-    const toTs = toEl && toEl.value ? parseISO(toEl.value) : null;
-
-    let visible = 0;
-
-    for(const card of cards){
-      const title = norm(card.getAttribute('data-title'));
-      const tags = (card.getAttribute('data-tags') || "").split(',').filter(Boolean);
-      const dates = (card.getAttribute('data-dates') || "").split(',').filter(Boolean);
-      const statuses = (card.getAttribute('data-statuses') || "").split(',').filter(Boolean);
-      const hasDates = (card.getAttribute('data-hasdates') || "0") === "1";
-
-      const okTitle = !q || title.includes(q);
-
-      let okTag = true;
-      if(activeTags.size > 0){
-        okTag = tags.some(t => activeTags.has(t));
-      }
-
-      let okDate = true;
-      if(status === "nodate"){
-        okDate = !hasDates;
-      } else if(fromTs !== null || toTs !== null){
-        okDate = hasDates && anyDateInRange(dates, fromTs, toTs);
-      } else if(status){
-        okDate = statuses.includes(status);
-      }
-
-      const ok = okTitle && okTag && okDate;
-      card.classList.toggle('di-hidden', !ok);
-      if(ok) visible++;
-    }
-
-    if(empty) empty.style.display = (visible === 0) ? 'block' : 'none';
+    engine.schedule(filterState);
   }
 
   tagBtns.forEach(btn => {
@@ -470,7 +484,12 @@ DIRINDEX_SCRIPT = r"""
     });
   });
 
-  if(qEl) qEl.addEventListener('input', apply);
+  if(qEl){
+    qEl.addEventListener('focus', loadSearch);
+    qEl.addEventListener('input', loadSearch);
+    qEl.addEventListener('input', window.KbFilter.debounce(apply, 120));
+    if(qEl.value) loadSearch();     // valor restaurado por el navegador
+  }
   if(statusEl) statusEl.addEventListener('change', apply);
   if(fromEl) fromEl.addEventListener('change', apply);
   if(toEl) toEl.addEventListener('change', apply);
@@ -481,7 +500,429 @@ DIRINDEX_SCRIPT = r"""
 """
 
 
-def _render_dir_index(group_name: str, entries: list[Entry], tag_colors: dict, allowed_tags: set[str]) -> str:
+# Carga por trozos de índices grandes (solo se carga en esas páginas)
+DIRINDEX_SHARDS_SCRIPT = r"""
+<script>
+(function(){
+  // Índice de directorio por trozos (modo "dirindex-shards"): el html trae
+  // solo la primera página de tarjetas y un JSON (<script type="application/json"
+  // data-di-data>) con:
+  //   total, size: nº de entradas y entradas por trozo
+  //   shards:      [url, ...]; el trozo k son las entradas [k*size, (k+1)*size)
+  //   tags:        [[display, norm, style], ...]
+  //   statuses:    ["later", "past", "soon"]   (o days: 1, ver dates.client_status)
+  // Cada trozo: [[title, href, [tagId...], [fecha...], [statusId... | día...]], ...]
+  // Sin filtros se cargan trozos al llegar al final de la lista; al filtrar se
+  // cargan todos (una vez) y se filtra sobre el conjunto completo con KbFilter.index.
+  if(window.KbDirShards) return;
+
+  const MARGIN = 600;   // px antes del final en los que ya se pide la página siguiente
+
+  function esc(s){
+    return String(s)
+      .replace(/&/g, '&amp;')
+      .replace(/</g, '&lt;')
+      .replace(/>/g, '&gt;')
+      .replace(/"/g, '&quot;')
+      .replace(/'/g, '&#x27;');
+  }
+
+  function create(wrap, data){
+    const F = window.KbFilter;
+    const empty = wrap.querySelector('[data-di-empty="1"]');
+    const more = wrap.querySelector('[data-di-more="1"]');
+    const size = data.size;
+    const total = data.total;
+    const tags = data.tags;
+    const statusesOf = data.days
+      ? (w => F.statusesOfDays(w))
+      : (w => w.map(st => data.statuses[st]).sort());
+
+    const rows = new Array(total);
+    const loads = new Map();        // trozo -> Promise
+    let idx = null;                 // KbFilter.index, cuando está todo cargado
+    let view = null;                // ids que pasan el filtro (null = todas, en orden)
+    let shown = Math.min(size, total);  // pintadas de la vista (la 1ª página viene en el html)
+    let gen = 0;                    // sube en cada repintado: descarta lo que llegue tarde
+    let busy = false;
+    let wanted = null;              // último estado de filtros pedido
+
+    function load(k){
+      let p = loads.get(k);
+      if(!p){
+        p = fetch(data.shards[k])
+          .then(r => {
+            if(!r.ok) throw new Error(`${r.status} ${data.shards[k]}`);
+            return r.json();
+          })
+          .then(part => { part.forEach((row, j) => { rows[k * size + j] = row; }); })
+          .catch(err => { loads.delete(k); throw err; });
+        loads.set(k, p);
+      }
+      return p;
+    }
+
+    function loadAll(){
+      return Promise.all(data.shards.map((_, k) => load(k)));
+    }
+
+    // Mismo html que dir_index._card_html (sin los data-* de filtrado)
+    function cardHtml(row){
+      const [title, href, tagIds, dates] = row;
+      const t = esc(title);
+      let h = `<a class="di-card" href="${esc(href)}" data-title="${t}"><div class="di-title">${t}</div>`;
+      let chips = '';
+      if(dates.length) chips += `<span class="di-chip">${esc(dates[0])}</span>`;
+      for(const id of tagIds){
+        chips += `<span class="di-chip" style="${tags[id][2]}">#${esc(tags[id][0])}</span>`;
+      }
+      if(chips) h += `<div class="di-meta">${chips}</div>`;
+      return h + '</a>';
+    }
+
+    function viewLength(){
+      return view ? view.length : total;
+    }
+
+    function nearEnd(){
+      return more.getBoundingClientRect().top < window.innerHeight + MARGIN;
+    }
+
+    // pinta la siguiente página de la vista (sin filtro, cargando su trozo)
+    function showMore(){
+      if(busy || shown >= viewLength()) return;
+      const my = gen;
+      const start = shown;
+      const end = Math.min(viewLength(), start + size);
+      busy = true;
+      (view ? Promise.resolve() : load(Math.floor(start / size))).then(() => {
+        if(my !== gen) return;
+        busy = false;
+        let h = '';
+        for(let k = start; k < end; k++) h += cardHtml(rows[view ? view[k] : k]);
+        empty.insertAdjacentHTML('beforebegin', h);
+        shown = end;
+        update();
+      }, err => {
+        if(my === gen) busy = false;
+        console.warn('dirindex:', err);
+      });
+    }
+
+    function update(){
+      const pending = shown < viewLength();
+      more.style.display = pending ? '' : 'none';
+      if(pending && nearEnd()) showMore();
+    }
+
+    function repaint(){
+      gen++;
+      busy = false;
+      wrap.querySelectorAll('.di-card').forEach(el => el.remove());
+      shown = 0;
+      empty.style.display = viewLength() === 0 ? 'block' : 'none';
+      showMore();
+      update();
+    }
+
+    function records(){
+      return rows.map(([title, , tagIds, dates, when]) => ({
+        title,
+        tags: Array.from(new Set(tagIds.map(id => tags[id][1]))),
+        users: [],
+        statuses: statusesOf(when),
+        dates,
+        hasDates: dates.length > 0,
+      }));
+    }
+
+    function isEmpty(state){
+      return !F.norm(state.q) && !state.status && !state.from && !state.to && !(state.tags && state.tags.size);
+    }
+
+    // state: lo mismo que KbFilter (q, status, from, to, tags)
+    function run(state){
+      wanted = state;
+      if(isEmpty(state)){
+        if(view !== null){
+          view = null;
+          repaint();
+        }
+        return;
+      }
+      loadAll().then(() => {
+        if(wanted !== state) return;    // ya hay otro estado más nuevo
+        if(!idx) idx = F.index(records(), new Uint8Array(total), 1);
+        const res = idx.compute(state);
+        const ids = new Int32Array(res.counts[0]);
+        let k = 0;
+        for(let i = 0; i < total; i++){
+          if(res.next[i]) ids[k++] = i;
+        }
+        view = ids;
+        repaint();
+      }, err => console.warn('dirindex:', err));
+    }
+
+    if('IntersectionObserver' in window){
+      new IntersectionObserver(es => {
+        if(es.some(e => e.isIntersecting)) showMore();
+      }, { rootMargin: `0px 0px ${MARGIN}px 0px` }).observe(more);
+    } else {
+      window.addEventListener('scroll', update, { passive: true });
+    }
+    update();
+
+    return {
+      size: total,
+      schedule: F.frameScheduler(run),
+    };
+  }
+
+  window.KbDirShards = { create };
+})();
+</script>
+"""
+
+
+# Buscador de texto con el índice invertido de search_index.py
+DIRINDEX_SEARCH_SCRIPT = r"""
+<script>
+(function(){
+  // Consulta del índice de texto de un grupo (search_index.build):
+  //   total, tokens (ordenadas), buckets {"ab": [ini, fin)}
+  //   post: por token, ids en diferencias o bitmap en base64 (palabras comunes)
+  // Cada palabra de la búsqueda es un prefijo: sus ids son la unión de los de
+  // las palabras del índice que empiezan así (un tramo de tokens, acotado por
+  // su bucket). El resultado es la intersección de las listas de todas, como
+  // Uint8Array por id para el `match` de KbFilter.
+  if(window.KbDirSearch) return;
+
+  const MAX_WORD = 32;    // search_index.MAX_WORD
+  const BUCKET = 2;       // search_index.BUCKET
+  const WORD_RE = /[\p{L}\p{N}_]+/gu;
+
+  // como search_index.fold + words (sin quitar las cortas: son prefijos)
+  function terms(q){
+    const s = (q || '').toString().normalize('NFD').replace(/[\u0300-\u036f]/g, '').toLowerCase();
+    return Array.from(new Set((s.match(WORD_RE) || []).map(w => w.slice(0, MAX_WORD))));
+  }
+
+  function intersect(a, b){
+    const out = new Int32Array(Math.min(a.length, b.length));
+    let i = 0, j = 0, k = 0;
+    while(i < a.length && j < b.length){
+      if(a[i] < b[j]) i++;
+      else if(a[i] > b[j]) j++;
+      else { out[k++] = a[i]; i++; j++; }
+    }
+    return out.subarray(0, k);
+  }
+
+  function create(data){
+    const total = data.total;
+    const tokens = data.tokens;
+    const post = data.post;
+    const buckets = data.buckets;
+    let lastQ = null, lastMatch = null;
+
+    // tramo [a, b) de tokens que empiezan por term
+    function range(term){
+      let lo = 0, hi = tokens.length;
+      if(term.length >= BUCKET){
+        const key = term.slice(0, BUCKET);
+        if(!Object.prototype.hasOwnProperty.call(buckets, key)) return [0, 0];
+        [lo, hi] = buckets[key];
+      }
+      let a = lo, z = hi;
+      while(a < z){
+        const mid = (a + z) >>> 1;
+        if(tokens[mid] < term) a = mid + 1;
+        else z = mid;
+      }
+      let b = a;
+      while(b < hi && tokens[b].startsWith(term)) b++;
+      return [a, b];
+    }
+
+    // ids (ordenados, sin repetir) de las entradas con alguna palabra que empiece por term
+    function idsOf(term){
+      const [a, b] = range(term);
+      if(b - a === 1 && typeof post[a] !== 'string'){
+        const deltas = post[a];
+        const out = new Int32Array(deltas.length);
+        let id = 0;
+        deltas.forEach((d, k) => { id += d; out[k] = id; });
+        return out;
+      }
+      const mark = new Uint8Array(total);
+      let count = 0;
+      for(let k = a; k < b; k++){
+        const p = post[k];
+        if(typeof p === 'string'){
+          const bits = atob(p);
+          for(let byte = 0; byte < bits.length; byte++){
+            let v = bits.charCodeAt(byte);
+            while(v){
+              const id = byte * 8 + 31 - Math.clz32(v & -v);
+              if(!mark[id]){ mark[id] = 1; count++; }
+              v &= v - 1;
+            }
+          }
+          continue;
+        }
+        let id = 0;
+        for(const d of p){
+          id += d;
+          if(!mark[id]){ mark[id] = 1; count++; }
+        }
+      }
+      const out = new Int32Array(count);
+      for(let i = 0, j = 0; j < count; i++){
+        if(mark[i]) out[j++] = i;
+      }
+      return out;
+    }
+
+    // null si la búsqueda no tiene palabras (entonces filtra KbFilter por título)
+    function query(q){
+      if(q === lastQ) return lastMatch;
+      const ts = terms(q);
+      let match = null;
+      if(ts.length){
+        const lists = ts.map(idsOf).sort((x, y) => x.length - y.length);
+        let acc = lists[0];
+        for(let k = 1; k < lists.length && acc.length; k++) acc = intersect(acc, lists[k]);
+        match = new Uint8Array(total);
+        for(const id of acc) match[id] = 1;
+      }
+      lastQ = q;
+      lastMatch = match;
+      return match;
+    }
+
+    return { total, query };
+  }
+
+  window.KbDirSearch = { create, terms };
+})();
+</script>
+"""
+
+
+DIRINDEX_CSS = kb_assets.static_asset("dirindex", "css", DIRINDEX_STYLE)
+DIRINDEX_JS = kb_assets.static_asset("dirindex", "js", DIRINDEX_SCRIPT)
+DIRINDEX_SHARDS_JS = kb_assets.static_asset("dirindex-shards", "js", DIRINDEX_SHARDS_SCRIPT)
+DIRINDEX_SEARCH_JS = kb_assets.static_asset("dirindex-search", "js", DIRINDEX_SEARCH_SCRIPT)
+FILTER_JS = kb_assets.static_asset("filters", "js", FILTER_ENGINE_SCRIPT)
+
+
+def _card_html(e: Entry, tag_colors: dict, client: bool) -> list[str]:
+    data_title = e.title.replace('"', "&quot;")
+    data_tags = ",".join(e.tags_norm).replace('"', "&quot;")
+    data_dates = ",".join(e.dates_iso).replace('"', "&quot;")
+    data_has = "1" if e.has_dates else "0"
+    if client:
+        # status en el navegador: solo los días (ver dates.client_status)
+        data_days = ",".join(map(str, kb_dates.epoch_days_for_isos(e.dates_iso)))
+        data_when = f' data-days="{data_days}"'
+    else:
+        data_statuses = ",".join(e.statuses).replace('"', "&quot;")
+        data_when = f' data-statuses="{data_statuses}"'
+
+    out = [
+        f'<a class="di-card" href="{e.href}"'
+        f' data-title="{data_title}"'
+        f' data-tags="{data_tags}"'
+        f' data-dates="{data_dates}"'
+        f'{data_when}'
+        f' data-hasdates="{data_has}">',
+        f'<div class="di-title">{e.title}</div>',
+    ]
+
+    meta = []
+
+    # muestra 1 fecha (si hay)
+    if e.dates_iso:
+        meta.append(f'<span class="di-chip">{e.dates_iso[0]}</span>')
+
+    # tags (en tarjeta sí con color, para informar)
+    for t in e.tags_display:
+        meta.append(f'<span class="di-chip" style="{_tag_style(tag_colors, t)}">#{t}</span>')
+
+    if meta:
+        out.append('<div class="di-meta">' + "".join(meta) + "</div>")
+
+    out.append("</a>")
+    return out
+
+
+@dataclass(frozen=True, slots=True)
+class Shards:
+    """Entradas de un índice partido en trozos JSON (modo dirindex-shards)."""
+    files: list[tuple[str, str]]    # (src_uri, json) de cada trozo, en orden
+    manifest: dict                  # lo que va inline, sin las urls de los trozos
+
+
+def _use_shards(page, n_entries: int) -> bool:
+    # True/False desde el front matter; si no, decide el tamaño del grupo
+    mode = (getattr(page, "meta", None) or {}).get(SHARDS_META_KEY)
+    if isinstance(mode, bool):
+        return mode and n_entries > 0
+    return n_entries > SHARD_MIN_ENTRIES
+
+
+def _build_shards(page, group_name: str, entries: list[Entry], tag_colors: dict, client: bool) -> Shards:
+    """
+    Filas compactas para DIRINDEX_SHARDS_SCRIPT: los tags como ids de un
+    diccionario común (va inline) y los status como ids (o días, con `client`).
+    Los trozos van junto a la página, con el hash del contenido en el nombre.
+    """
+    tag_ids: dict[str, int] = {}
+    tags: list[list[str]] = []
+    rows = []
+    for e in entries:
+        ids = []
+        for t in e.tags_display:
+            tid = tag_ids.get(t)
+            if tid is None:
+                tid = tag_ids[t] = len(tags)
+                tags.append([t, _norm_tag(t), _tag_style(tag_colors, t)])
+            ids.append(tid)
+        if client:
+            when = kb_dates.epoch_days_for_isos(e.dates_iso)
+        else:
+            when = [_SHARD_STATUS_IDS[st] for st in e.statuses]
+        rows.append([e.title, e.href, ids, e.dates_iso, when])
+
+    base = posixpath.dirname(page.file.dest_uri)
+    files = []
+    for k in range(0, len(rows), SHARD_SIZE):
+        content = json.dumps(rows[k:k + SHARD_SIZE], ensure_ascii=False, separators=(",", ":"))
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:10]
+        name = f"_dirindex/{group_name.lower()}-{k // SHARD_SIZE}.{digest}.json"
+        files.append((posixpath.join(base, name), content))
+
+    when = {"days": 1} if client else {"statuses": SHARD_STATUSES}
+    manifest = {"total": len(rows), "size": SHARD_SIZE, "tags": tags, **when}
+    return Shards(files, manifest)
+
+
+def _shards_island(manifest: dict, urls: list[str]) -> str:
+    payload = json.dumps({**manifest, "shards": urls}, ensure_ascii=False, separators=(",", ":"))
+    # "<" solo puede ir dentro de strings: así no hay </script> ni <!-- posibles
+    payload = payload.replace("<", "\\u003c")
+    return f'<script type="application/json" data-di-data="1">{payload}</script>'
+
+
+def _render_dir_index(
+    page,
+    entries: list[Entry],
+    tag_colors: dict,
+    client: bool = False,
+    shards_island: str | None = None,
+    search_url: str | None = None,
+) -> str:
     # tags presentes en ese directorio
     present = set()
     for e in entries:
@@ -500,15 +941,19 @@ def _render_dir_index(group_name: str, entries: list[Entry], tag_colors: dict, a
         )
 
     out = []
-    out.append(DIRINDEX_STYLE)
-    out.append('<div class="di-wrap" data-di-wrap="1">')
+    search_attr = f' data-di-search="{html_escape(search_url, quote=True)}"' if search_url else ""
+    # fuera del índice del plugin search (las notas ya tienen su propia entrada).
+    # Es un <section> porque el parser de Material compara los elementos solo
+    # por etiqueta: un <div> excluido deja de estarlo en el primer </div> de dentro
+    out.append(f'<section class="di-wrap" data-di-wrap="1" data-search-exclude="1"{search_attr}>')
+    out.append(kb_assets.stylesheet_tag(DIRINDEX_CSS, page))
 
     # controles
     out.append('<div class="di-controls">')
     out.append(
         '<div class="di-field">'
-        '<label>Nombre</label>'
-        '<input class="di-input" type="search" placeholder="Buscar..." data-di-filter="q" />'
+        '<label>Buscar</label>'
+        '<input class="di-input" type="search" placeholder="Título o texto..." data-di-filter="q" />'
         '</div>'
     )
     out.append(
@@ -546,43 +991,23 @@ def _render_dir_index(group_name: str, entries: list[Entry], tag_colors: dict, a
     if not entries:
         out.append('<div class="di-empty">—</div>')
     else:
-        for e in entries:
-            data_title = e.title.replace('"', "&quot;")
-            data_tags = ",".join(e.tags_norm).replace('"', "&quot;")
-            data_dates = ",".join(e.dates_iso).replace('"', "&quot;")
-            data_statuses = ",".join(e.statuses).replace('"', "&quot;")
-            data_has = "1" if e.has_dates else "0"
-
-            out.append(
-                f'<a class="di-card" href="{e.href}"'
-                f' data-title="{data_title}"'
-                f' data-tags="{data_tags}"'
-                f' data-dates="{data_dates}"'
-                f' data-statuses="{data_statuses}"'
-                f' data-hasdates="{data_has}">'
-            )
-            out.append(f'<div class="di-title">{e.title}</div>')
-
-            meta = []
-
-            # muestra 1 fecha (si hay)
-            if e.dates_iso:
-                meta.append(f'<span class="di-chip">{e.dates_iso[0]}</span>')
-
-            # tags (en tarjeta sí con color, para informar)
-            for t in e.tags_display:
-                meta.append(f'<span class="di-chip" style="{_tag_style(tag_colors, t)}">#{t}</span>')
-
-            if meta:
-                out.append('<div class="di-meta">' + "".join(meta) + "</div>")
-
-            out.append("</a>")
+        # por trozos: solo la primera página; el resto lo pinta el navegador
+        for e in entries[:SHARD_SIZE] if shards_island else entries:
+            out.extend(_card_html(e, tag_colors, client))
 
         out.append('<div class="di-empty" data-di-empty="1" style="display:none;">Sin resultados</div>')
 
     out.append("</div>")  # list
-    out.append(DIRINDEX_SCRIPT)
-    out.append("</div>")  # wrap
+    if shards_island:
+        out.append('<div class="di-more" data-di-more="1">Cargando…</div>')
+        out.append(shards_island)
+    out.append(kb_assets.script_tag(FILTER_JS, page))
+    if shards_island:
+        out.append(kb_assets.script_tag(DIRINDEX_SHARDS_JS, page))
+    if search_url:
+        out.append(kb_assets.script_tag(DIRINDEX_SEARCH_JS, page))
+    out.append(kb_assets.script_tag(DIRINDEX_JS, page))
+    out.append("</section>")  # wrap
     return "\n".join(out)
 
 
@@ -591,28 +1016,78 @@ def _render_dir_index(group_name: str, entries: list[Entry], tag_colors: dict, a
 # =========================================================
 
 def on_page_markdown(markdown, page, config, files, **kwargs):
+    """
+    Primera fase: guarda los metadatos de la página (ya leída por mkdocs) y
+    apunta las que llevan <!-- AUTO:DIRINDEX X -->. El comentario pasa tal
+    cual al HTML y se rellena en on_env, cuando ya se han leído todas.
+    """
+    # las palabras (buscador) solo hacen falta en las notas de algún grupo
+    kb_meta.harvest_page(page, with_words=bool(_GROUP_PATHS.match(page.file.src_uri)))
+    if page_scan.scan_page(markdown, page).dirindex:
+        _PENDING[page.file.src_uri] = page
+    return markdown
+
+
+def _fill_dir_index(page, files, config, tag_colors: dict, allowed_tags: set[str], today: date) -> None:
     """
     Reemplaza el marcador <!-- AUTO:DIRINDEX X --> por un listado+buscador
     de los MD dentro de research/X (sin necesidad de que estén en nav).
     """
-    m = DIRINDEX_MARK_RE.search(markdown or "")
+    m = DIRINDEX_MARK_RE.search(page.content or "")
     if not m:
-        return markdown
-            
+        return
+
     group_raw = m.group(1).strip()
     group = GROUP_ALIASES.get(group_raw.lower(), group_raw)
 
     if group not in GROUP_ROOTS:
-        return markdown
+        return
+
+    entries = _collect_entries(files, page, group, allowed_tags, today, config)
+    client = kb_dates.client_status(config)
 
+    island = None
+    if _use_shards(page, len(entries)):
+        shards = _build_shards(page, group, entries, tag_colors, client)
+        urls = []
+        for src_uri, content in shards.files:
+            f = files.get_file_from_path(src_uri)
+            if f is None:
+                f = File.generated(config, src_uri, content=content)
+                files.append(f)
+            urls.append(kb_urls.relative_url(f.url, page.url))
+        island = _shards_island(shards.manifest, urls)
+
+    search = _search_file(files, config, group, allowed_tags, today)
+    search_url = kb_urls.relative_url(search.url, page.url) if search else None
+
+    html = _render_dir_index(page, entries, tag_colors, client, island, search_url)
+
+    # Reemplaza solo el primer marcador encontrado
+    page.content = DIRINDEX_MARK_RE.sub(lambda _: html, page.content, count=1)
+
+
+def on_env(env, config, files, **kwargs):
+    """Segunda fase: todas las páginas leídas; grupos una vez y relleno de los índices."""
+    if not _PENDING:
+        return env
 
     tag_colors = _load_tag_colors()
     allowed_tags = {k for k in tag_colors.keys() if k != "__default__"}
+    today = kb_dates.today()
+    for page in _PENDING.values():
+        _fill_dir_index(page, files, config, tag_colors, allowed_tags, today)
+    return env
 
-    today = _today_madrid()
-    entries = _collect_entries(files, page, group, allowed_tags, today)
 
-    html = _render_dir_index(group, entries, tag_colors, allowed_tags)
+def on_files(files, config, **kwargs):
+    kb_assets.add_to_files(files, config, (DIRINDEX_CSS, FILTER_JS, DIRINDEX_SHARDS_JS, DIRINDEX_SEARCH_JS, DIRINDEX_JS))
+    return files
 
-    # Reemplaza solo el primer marcador encontrado
-    return DIRINDEX_MARK_RE.sub(lambda _: html, markdown, count=1)
+
+def on_pre_build(config, **kwargs):
+    kb_dates.reset_today()
+
+
+def on_shutdown(**kwargs):
+    kb_registry.shutdown()
@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import logging
+import os
+import re
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from mkdocs.utils.meta import get_data
+
+import cache_registry as kb_registry
+import search_index as kb_search
+
+log = logging.getLogger(f"mkdocs.hooks.{__name__}")
+
+# Metadatos de las notas (título H1, tags, fechas @{...} y las palabras del texto
+# para el buscador de dir_index) guardados en SQLite:
+# .cache/docmeta.sqlite3, una fila por src_uri con el mtime/tamaño del fichero y
+# la versión del extractor. En cada build solo se vuelven a leer las notas que
+# han cambiado (o si cambia EXTRACTOR_VERSION) y se borran las que ya no están.
+# Los status de las fechas NO se guardan: dependen del día y los calcula quien
+# consulta (dates.statuses_for_isos).
+#
+# Sin config_file_path (o si SQLite falla) se extrae todo en memoria, como antes.
+#
+# Durante el build, mkdocs ya lee cada página (page.markdown / page.meta): los
+# hooks la registran con harvest_page() y get_documents() usa eso antes que el
+# disco. El almacén solo cubre lo que no se haya leído aún (p. ej. las páginas
+# que no se vuelven a procesar con `build --dirty`). Los dos caminos separan el
+# front matter igual (get_data de mkdocs) y dan el mismo DocMeta.
+
+EXTRACTOR_VERSION = 3   # 2: front matter (tags:, title:) separado del cuerpo; 3: words
+SCHEMA_VERSION = 2      # formato de la tabla; si no coincide se rehace entera
+DB_PATH = Path(".cache") / "docmeta.sqlite3"
+
+# lecturas en paralelo (E/S); pocas, para no saturar el disco
+MAX_READ_WORKERS = 8
+
+# TAG_RE es (?<!\w)#(...) escrito empezando por el literal "#": re salta
+# directamente a los "#" en vez de probar el lookbehind en cada posición.
+TAG_RE = re.compile(r"#(?<!\w#)([\w\-_/]+)")
+DATE_RE = re.compile(r"@\{(\d{4}-\d{2}-\d{2})\}")
+H1_RE = re.compile(r"^#\s+(.+?)\s*$", re.M)
+
+# snapshot por objeto Files: el almacén se sincroniza una vez por build
+_SNAPSHOTS = kb_registry.files_cache("doc_meta.snapshot")
+_DOCUMENTS = kb_registry.files_cache("doc_meta.documents")
+# src_uri -> DocMeta de las páginas que mkdocs ya ha leído en este build
+_HARVESTED = kb_registry.cache("doc_meta.harvested")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    src_uri  TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size     INTEGER NOT NULL,
+    version  INTEGER NOT NULL,
+    title    TEXT,
+    tags     TEXT NOT NULL,
+    dates    TEXT NOT NULL,
+    words    TEXT NOT NULL
+)
+"""
+# tags, fechas y palabras van unidos por "\n" (ninguno puede contenerlo): se leen
+# con un split, bastante más rápido que json.loads para 20k filas
+
+
+def _join(values: tuple[str, ...]) -> str:
+    return "\n".join(values)
+
+
+def _split(value: str) -> tuple[str, ...]:
+    return tuple(value.split("\n")) if value else ()
+
+
+@dataclass(frozen=True, slots=True)
+class DocMeta:
+    title: str | None               # H1; None si no tiene
+    tags: tuple[str, ...]           # tal cual, sin '#', en orden de aparición
+    dates_iso: tuple[str, ...]      # 'YYYY-MM-DD', en orden de aparición
+    words: tuple[str, ...] | None   # palabras distintas de título y cuerpo (search_index.words); None si no se han sacado
+
+
+@dataclass(frozen=True, slots=True)
+class Document:
+    src_uri: str
+    url: str
+    meta: DocMeta | None            # None si no se pudo leer
+
+
+def _meta_tags(meta: dict) -> list[str]:
+    """tags: del front matter (lista o texto separado por comas/espacios), sin '#'."""
+    raw = meta.get("tags") if isinstance(meta, dict) else None
+    if isinstance(raw, str):
+        raw = raw.replace(",", " ").split()
+    elif not isinstance(raw, (list, tuple)):
+        return []
+    out = []
+    for t in raw:
+        t = str(t).strip().lstrip("#").strip() if t is not None else ""
+        if t and "\n" not in t:
+            out.append(t)
+    return out
+
+
+def scan_source(markdown: str, meta: dict, *, with_words: bool = True) -> DocMeta:
+    """
+    DocMeta de una página ya separada en cuerpo y front matter (como
+    page.markdown / page.meta). Tags: las del front matter primero y después
+    las #tag del cuerpo que no estén ya entre ellas. Sacar las palabras es lo
+    más caro: with_words=False las deja en None.
+    """
+    m = H1_RE.search(markdown)
+    title = m.group(1).strip() if m else None
+    if title is None and isinstance(meta, dict) and isinstance(meta.get("title"), str):
+        title = meta["title"].strip() or None
+
+    tags = TAG_RE.findall(markdown)
+    front = _meta_tags(meta)
+    if front:
+        seen = {t.upper() for t in front}
+        tags = front + [t for t in tags if t.upper() not in seen]
+
+    words = kb_search.words(markdown) if with_words else None
+    if words is not None and title is not None and not m:
+        words = kb_search.merge(kb_search.words(title), words)
+
+    return DocMeta(
+        title=title,
+        tags=tuple(tags),
+        dates_iso=tuple(d.strip() for d in DATE_RE.findall(markdown)),
+        words=words,
+    )
+
+
+def scan_markdown(txt: str) -> DocMeta:
+    """DocMeta del texto completo de un .md (con su front matter, si tiene)."""
+    return scan_source(*get_data(txt))
+
+
+def harvest_page(page, *, with_words: bool = True) -> None:
+    """Registra los metadatos de una página que mkdocs acaba de leer."""
+    src_uri = (getattr(page.file, "src_uri", "") or "").replace("\\", "/")
+    if src_uri and page.markdown is not None:
+        _HARVESTED[src_uri] = scan_source(page.markdown, page.meta or {}, with_words=with_words)
+
+
+def _read_and_scan(path: str) -> DocMeta | None:
+    try:
+        txt = Path(path).read_text(encoding="utf-8-sig", errors="ignore")
+    except Exception:
+        return None
+    return scan_markdown(txt)
+
+
+def _read_all(paths: list[str]) -> list[DocMeta | None]:
+    if not paths:
+        return []
+    # map() devuelve en el mismo orden
+    with ThreadPoolExecutor(max_workers=MAX_READ_WORKERS) as pool:
+        return list(pool.map(_read_and_scan, paths))
+
+
+def db_path(config) -> Path | None:
+    cfg_path = config.get("config_file_path") if config else None
+    if not cfg_path:
+        return None
+    return Path(cfg_path).resolve().parent / DB_PATH
+
+
+def _doc_sources(files) -> list[tuple[str, str]]:
+    """(src_uri, abs_src_path) de las páginas con fichero en disco."""
+    out = []
+    for f in files.documentation_pages():
+        abs_src_path = getattr(f, "abs_src_path", "") or ""
+        src_uri = (getattr(f, "src_uri", "") or "").replace("\\", "/")
+        if abs_src_path and src_uri:
+            out.append((src_uri, abs_src_path))
+    return out
+
+
+def _stat(path: str) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class DocMetaStore:
+    """Almacén en SQLite; sync() deja la tabla al día con el conjunto de notas actual."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.reads = 0          # notas leídas en el último sync
+        self.reused = 0         # notas que venían de la base de datos
+        self.pruned = 0         # filas borradas (notas que ya no existen)
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            with conn:
+                conn.execute("DROP TABLE IF EXISTS docs")
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.execute(_SCHEMA)
+        return conn
+
+    def sync(self, docs: list[tuple[str, str]]) -> dict[str, DocMeta]:
+        conn = self._connect()
+        try:
+            rows = {
+                src: (mtime_ns, size, version, title, tags, dates, words)
+                for src, mtime_ns, size, version, title, tags, dates, words in conn.execute(
+                    "SELECT src_uri, mtime_ns, size, version, title, tags, dates, words FROM docs"
+                )
+            }
+
+            out: dict[str, DocMeta] = {}
+            stale: list[tuple[str, str, tuple[int, int]]] = []
+            for src, abs_path in docs:
+                sig = _stat(abs_path)
+                if sig is None:
+                    continue
+                row = rows.get(src)
+                if row is not None and row[:3] == (*sig, EXTRACTOR_VERSION):
+                    out[src] = DocMeta(row[3], _split(row[4]), _split(row[5]), _split(row[6]))
+                else:
+                    stale.append((src, abs_path, sig))
+
+            upserts = []
+            for (src, _, sig), meta in zip(stale, _read_all([s[1] for s in stale])):
+                if meta is None:
+                    continue    # no se pudo leer: no se guarda, se reintenta en el siguiente build
+                out[src] = meta
+                upserts.append((
+                    src, sig[0], sig[1], EXTRACTOR_VERSION, meta.title,
+                    _join(meta.tags), _join(meta.dates_iso), _join(meta.words),
+                ))
+
+            gone = [(src,) for src in rows.keys() - {src for src, _ in docs}]
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO docs VALUES (?, ?, ?, ?, ?, ?, ?, ?)", upserts)
+                conn.executemany("DELETE FROM docs WHERE src_uri = ?", gone)
+
+            self.reads, self.reused, self.pruned = len(stale), len(docs) - len(stale), len(gone)
+            return out
+        finally:
+            conn.close()
+
+    def stats(self) -> dict[str, int]:
+        return {"reads": self.reads, "reused": self.reused, "pruned": self.pruned}
+
+
+def _extract_in_memory(docs: list[tuple[str, str]]) -> dict[str, DocMeta]:
+    out = {}
+    for (src, _), meta in zip(docs, _read_all([d[1] for d in docs])):
+        if meta is not None:
+            out[src] = meta
+    return out
+
+
+def _snapshot(files, config) -> dict[str, DocMeta]:
+    docs = _doc_sources(files)
+    path = db_path(config)
+    if path is not None:
+        store = DocMetaStore(path)
+        try:
+            out = store.sync(docs)
+        except (sqlite3.Error, OSError) as e:
+            log.warning("docmeta: no se pudo usar %s (%s); se leen todas las notas", path, e)
+        else:
+            log.debug("docmeta: %s", store.stats())
+            return out
+    return _extract_in_memory(docs)
+
+
+def get_metadata(files, config) -> dict[str, DocMeta]:
+    """src_uri -> DocMeta de todas las páginas; se sincroniza una vez por objeto Files."""
+    return _SNAPSHOTS.get_or_create(files, lambda: _snapshot(files, config))
+
+
+def get_documents(files, config) -> list[Document]:
+    """
+    Las páginas del build (en el orden de files) con url y sus metadatos. Se
+    monta una vez por objeto Files; dir_index clasifica sobre esto.
+    Si se llama cuando mkdocs ya ha leído las páginas (on_env...), no toca el
+    disco; si falta alguna, se sincroniza el almacén.
+    """
+    def build() -> list[Document]:
+        pages = []
+        for f in files.documentation_pages():
+            url = getattr(f, "url", None)
+            src_uri = (getattr(f, "src_uri", "") or "").replace("\\", "/")
+            if url and src_uri and getattr(f, "abs_src_path", None):
+                pages.append((src_uri, url))
+
+        metas = [_HARVESTED.get(src) for src, _ in pages]
+        if None in metas:
+            stored = get_metadata(files, config)
+            metas = [m if m is not None else stored.get(src) for m, (src, _) in zip(metas, pages)]
+        return [Document(src, url, meta) for (src, url), meta in zip(pages, metas)]
+
+    return _DOCUMENTS.get_or_create(files, build)
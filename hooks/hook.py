@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import json
+import logging
+import re
 import sys
 from pathlib import Path
 from html import escape
@@ -10,11 +13,20 @@ if str(_THIS_DIR) not in sys.path:
 
 from tag_colors import load_tag_colors, tag_style, norm_tag  # noqa: E402
 from styles import KB_STYLE  # noqa: E402
-from script import KB_SCRIPT  # noqa: E402
+from script import KB_SCRIPT, FILTER_ENGINE_SCRIPT, VIRTUAL_BOARD_SCRIPT  # noqa: E402
 import parse as kb_parse  # noqa: E402
+import board_cache as kb_cache  # noqa: E402
+import dates as kb_dates  # noqa: E402
 import links as kb_links  # noqa: E402
+import link_graph as kb_graph  # noqa: E402
+import page_scan  # noqa: E402
+import cache_registry as kb_registry  # noqa: E402
+import static_assets as kb_assets  # noqa: E402
+import search_index as kb_search  # noqa: E402
 
 
+log = logging.getLogger(f"mkdocs.hooks.{__name__}")
+
 DEFAULT_DOC_ROOTS = [
     "research/Developments",
     "Developments",
@@ -32,42 +44,363 @@ ARCHIVE_COL_KEYWORD = "archiv"
 # Solo para separar visualmente en 2 bloques
 USER_TAG_SET = {"DDOBRE", "IBOUABDI", "PMASIA", "IBOUADI"}
 
+# CSS/JS del tablero como ficheros con hash (se añaden en on_files)
+KB_CSS = kb_assets.static_asset("kanban", "css", KB_STYLE)
+KB_JS = kb_assets.static_asset("kanban", "js", KB_SCRIPT)
+FILTER_JS = kb_assets.static_asset("filters", "js", FILTER_ENGINE_SCRIPT)
+KB_VIRTUAL_JS = kb_assets.static_asset("kanban-virtual", "js", VIRTUAL_BOARD_SCRIPT)
+
+# Modo virtualizado: con más de VIRTUAL_MIN_CARDS tarjetas (o con
+# `kanban-virtual: true` en el front matter) las tarjetas van en un JSON y el
+# navegador pinta solo lo visible de cada columna. `kanban-virtual: false` lo
+# apaga aunque el tablero sea grande.
+VIRTUAL_META_KEY = "kanban-virtual"
+VIRTUAL_MIN_CARDS = 2000
+VIRTUAL_STATUSES = ("later", "past", "soon")
+_VIRTUAL_STATUS_IDS = {st: i for i, st in enumerate(VIRTUAL_STATUSES)}
+
+# Fragmentos html ya montados, por build (el registro los vacía en on_pre_build):
+# los tags y fechas se repiten muchísimo entre tarjetas y las tarjetas que no
+# cambian se pintan igual en cada página/reconstrucción.
+_TAG_CHIP_HTML = kb_registry.cache("kanban.tag_chips")
+_DATE_CHIP_HTML = kb_registry.cache("kanban.date_chips")
+_CARD_HTML = kb_registry.cache("kanban.cards", maxsize=50_000)
+
+# Buscador del site (plugin search): un tablero es la página entera, así que la
+# página se marca `search: exclude` y el plugin no indexa nada de ella (toolbar,
+# chips, tarjetas). En su lugar van una entrada para la página y una por
+# tarjeta (título; columna, fechas y tags como texto) que apunta a su ancla;
+# se añaden a search_index.json en on_post_build, cuando el plugin ya lo ha
+# escrito. En modo virtual las tarjetas no están en el html (no hay ancla a la
+# que ir): van como texto de la entrada de la página, una línea por tarjeta.
+SEARCH_INDEX_PATH = Path("search") / "search_index.json"
+# page.url -> (page, [entrada por tarjeta], texto de la entrada de la página)
+_SEARCH_CARDS = kb_registry.cache("kanban.search_cards")
+_ANCHOR_RE = re.compile(r"\W+")
+
+
+def tag_chip_html(tag_colors: dict, tag: str) -> str:
+    html = _TAG_CHIP_HTML.get(tag)
+    if html is None:
+        style = tag_style(tag_colors, tag)
+        if norm_tag(tag) in USER_TAG_SET:
+            html = f'<span class="kb-chip kb-tag kb-user" style="{style}">@{escape(tag)}</span>'
+        else:
+            html = f'<span class="kb-chip kb-tag" style="{style}">#{escape(tag)}</span>'
+        _TAG_CHIP_HTML[tag] = html
+    return html
+
+
+def date_chip_html(ds: str, st: str | None, client: bool = False) -> str:
+    # client: sin status; el día va en data-kb-day y la clase la pone el script
+    key = (ds, st, client)
+    html = _DATE_CHIP_HTML.get(key)
+    if html is None:
+        if client and st:
+            day = kb_dates.epoch_day(kb_dates.iso_to_ordinal(ds))
+            html = f'<span class="kb-chip kb-date" data-kb-day="{day}">{escape(ds)}</span>'
+        else:
+            cls = f"kb-chip kb-date {st}" if st else "kb-chip kb-date"
+            html = f'<span class="{cls}">{escape(ds)}</span>'
+        _DATE_CHIP_HTML[key] = html
+    return html
+
+
+def render_card(c, tag_colors: dict, done_visual: bool = False, client: bool = False, anchor: str | None = None) -> str:
+    # todo lo que sale en el html está en la clave (href incluido, que depende
+    # de la página); los statuses ya vienen calculados con el "hoy" del build y
+    # con `client` no salen en el html. El ancla no: es única en la página, así
+    # que se pone fuera del fragmento cacheado, delante de data-title (el href
+    # va escapado con quote=True: antes no puede haber ningún ' data-title="')
+    key = (
+        done_visual, client, c["title"], c.get("href"), tuple(c["date_items"]),
+        tuple(c["tags"]), tuple(c["tags_norm"]), tuple(c["dates_iso"]),
+        None if client else tuple(c["statuses"]),
+    )
+    html = _CARD_HTML.get(key)
+    if html is None:
+        html = _CARD_HTML[key] = _render_card(c, tag_colors, done_visual, client)
+    if not anchor:
+        return html
+    i = html.index(' data-title="')
+    return f'{html[:i]} id="{anchor}"{html[i:]}'
+
+
+def _render_card(c, tag_colors: dict, done_visual: bool, client: bool = False) -> str:
+    done_cls = " kb-done" if done_visual else ""
+    data_title = escape(c["title"], quote=True)
+
+    tags_user_norm = [t for t in c["tags_norm"] if t in USER_TAG_SET]
+    tags_norm_only = [t for t in c["tags_norm"] if t not in USER_TAG_SET]
+
+    data_tags = escape(",".join(tags_norm_only), quote=True)
+    data_users = escape(",".join(tags_user_norm), quote=True)
+    data_dates = escape(",".join(c["dates_iso"]), quote=True)
+    data_hasdates = "1" if c["has_dates"] else "0"
+    if client:
+        days = ",".join(map(str, kb_dates.epoch_days_for_isos(c["dates_iso"])))
+        data_when = f' data-days="{days}"'
+    else:
+        data_when = f' data-statuses="{escape(",".join(c["statuses"]), quote=True)}"'
+
+    attrs = (
+        f' data-title="{data_title}"'
+        f' data-tags="{data_tags}"'
+        f' data-users="{data_users}"'
+        f' data-dates="{data_dates}"'
+        f'{data_when}'
+        f' data-hasdates="{data_hasdates}"'
+    )
+
+    parts = []
+    if c.get("href"):
+        parts.append(f'<a class="kb-card{done_cls}" href="{escape(c["href"], quote=True)}"{attrs}>')
+    else:
+        parts.append(f'<article class="kb-card{done_cls}"{attrs}>')
+
+    parts.append(f'<div class="kb-card-title">{escape(c["title"])}</div>')
+
+    chips = [date_chip_html(ds, st, client) for ds, st in c["date_items"]]
+    chips.extend(tag_chip_html(tag_colors, tag) for tag in c["tags"])
+
+    if chips:
+        parts.append('<div class="kb-meta">' + "".join(chips) + '</div>')
+
+    parts.append("</a>" if c.get("href") else "</article>")
+    return "".join(parts)
+
+
+def card_anchor(title: str, used: set[str]) -> str:
+    """id de la tarjeta en la página: kb-<título normalizado>, sin repetir."""
+    base = "kb-" + (_ANCHOR_RE.sub("-", kb_search.fold(title)).strip("-")[:32].rstrip("-") or "card")
+    anchor, n = base, 1
+    while anchor in used:
+        n += 1
+        anchor = f"{base}-{n}"
+    used.add(anchor)
+    return anchor
+
+
+def card_search_text(c, col_title: str) -> str:
+    """Columna, fechas y tags de una tarjeta para el buscador (html escapado, como el plugin)."""
+    text = [escape(col_title, quote=False)]
+    if c.get("done"):
+        text.append("Completada")
+    text.extend(escape(ds, quote=False) for ds, _ in c["date_items"])
+    if c["tags"]:
+        text.append(" ".join(
+            ("@" if norm_tag(t) in USER_TAG_SET else "#") + escape(t, quote=False) for t in c["tags"]
+        ))
+    return " · ".join(text)
+
+
+def card_search_line(c, col_title: str) -> str:
+    """Línea de una tarjeta en el texto de la página (modo virtual)."""
+    return f'{escape(c["title"], quote=False)} · {card_search_text(c, col_title)}'
+
+
+def search_entry(page_url: str, anchor: str, c, col_title: str) -> dict:
+    """Entrada de search_index.json para una tarjeta."""
+    return {
+        "location": f"{page_url}#{anchor}",
+        "title": escape(c["title"], quote=False),
+        "text": card_search_text(c, col_title),
+    }
+
+
+class _VirtualBoard:
+    """
+    Tarjetas del modo virtualizado, en el formato que espera
+    script.VIRTUAL_BOARD_SCRIPT: filas compactas y los tags como ids de un
+    diccionario compartido (y los href igual, que se repiten mucho). La columna
+    0 es la de completadas. Con `client`, cada fecha lleva su día en vez del
+    id de status.
+    """
+
+    def __init__(self, tag_colors: dict, client: bool = False):
+        self.tag_colors = tag_colors
+        self.client = client
+        self.tag_ids: dict[str, int] = {}
+        self.tags: list[list] = []
+        self.href_ids: dict[str, int] = {}
+        self.hrefs: list[str] = []
+        self.cols: list[list] = [[1, []]]            # [done, filas]
+        self.col_meta: list[tuple[str, bool]] = []   # (título, archivada) de las normales
+
+    def add_column(self, col) -> None:
+        self.col_meta.append((col["title"], bool(col.get("archived"))))
+        self.cols.append([0, []])
+
+    def add_card(self, c) -> None:
+        ids = []
+        for tag in c["tags"]:
+            tid = self.tag_ids.get(tag)
+            if tid is None:
+                tid = self.tag_ids[tag] = len(self.tags)
+                tnorm = norm_tag(tag)
+                self.tags.append([tag, tnorm, tag_style(self.tag_colors, tag), 1 if tnorm in USER_TAG_SET else 0])
+            ids.append(tid)
+        if self.client:
+            dates = [
+                [ds, kb_dates.epoch_day(kb_dates.iso_to_ordinal(ds)) if st else None]
+                for ds, st in c["date_items"]
+            ]
+        else:
+            dates = [[ds, _VIRTUAL_STATUS_IDS[st] if st else None] for ds, st in c["date_items"]]
+        href = c.get("href")
+        href_id = None
+        if href:
+            href_id = self.href_ids.get(href)
+            if href_id is None:
+                href_id = self.href_ids[href] = len(self.hrefs)
+                self.hrefs.append(href)
+        row = [c["title"], href_id, ids, dates]
+        self.cols[0 if c.get("done") else -1][1].append(row)
+
+    def board_html(self) -> list[str]:
+        parts = []
+        for i, (title, archived) in enumerate(self.col_meta, start=1):
+            arch_cls = " kb-archived" if archived else ""
+            parts.append(f'<section class="kb-col{arch_cls}">')
+            parts.append(f'<header class="kb-col-title">{escape(title)}</header>')
+            parts.append(f'<div class="kb-cards kb-virtual" data-kb-vcol="{i}"></div></section>')
+        parts.append('<section class="kb-col kb-done-col">')
+        parts.append('<header class="kb-col-title">Completadas</header>')
+        parts.append('<div class="kb-cards kb-virtual" data-kb-vcol="0"></div></section>')
+        return parts
+
+    def island_html(self) -> str:
+        # con `client` no hay tabla de status: "days" indica que van días
+        when = {"days": 1} if self.client else {"statuses": VIRTUAL_STATUSES}
+        payload = json.dumps(
+            {"tags": self.tags, "hrefs": self.hrefs, **when, "cols": self.cols},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        # "<" solo puede ir dentro de strings: así no hay </script> ni <!-- posibles
+        payload = payload.replace("<", "\\u003c")
+        return f'<script type="application/json" data-kb-data="1">{payload}</script>'
+
 
 def on_page_markdown(markdown, page, config, files, **kwargs):
-    meta = getattr(page, "meta", {}) or {}
-    if not kb_parse.is_obsidian_kanban_board(markdown, meta):
+    if not page_scan.scan_page(markdown, page).kanban:
         return markdown
+    meta = getattr(page, "meta", {}) or {}
 
     tag_colors = load_tag_colors()
     today = kb_parse.today_madrid()
+    resolver = kb_links.get_resolver(files, config)
+    client = kb_dates.client_status(config)
+
+    # True/False desde el front matter; None = decide el tamaño del tablero
+    mode = meta.get(VIRTUAL_META_KEY)
+    virtual = mode if isinstance(mode, bool) else None
+    vboard = _VirtualBoard(tag_colors, client) if virtual else None
+    # sin decidir: solo se guardan los eventos; el JSON se monta si se pasa
+    # del umbral (los tableros pequeños no pagan las filas del modo virtual)
+    pending = [] if virtual is None else None
+    n_cards = 0
+    search_cards = []       # (ancla, tarjeta, columna) de las que van en el html
+    search_lines = []       # modo virtual: solo el texto (no se guardan las tarjetas)
+    anchors: set[str] = set()
+    card_links = []         # para link_graph: (target, None, url destino)
+
+    # Se va pintando según se parsea: solo guardamos html, no las tarjetas.
+    # Las completadas salen a una columna extra.
+    board_parts = []
+    done_html = []
+    all_tags_norm = set()
+    col = None
+    col_cards = []
+
+    def close_column():
+        arch_cls = " kb-archived" if col.get("archived") else ""
+        board_parts.append(f'<section class="kb-col{arch_cls}">')
+        board_parts.append(f'<header class="kb-col-title">{escape(col["title"])}</header>')
+        board_parts.append('<div class="kb-cards">')
+
+        if not col_cards:
+            board_parts.append('<div class="kb-empty">—</div>')
+        else:
+            board_parts.extend(col_cards)
+            board_parts.append('<div class="kb-empty" data-kb-empty="filtered" style="display:none;">Sin resultados</div>')
+
+        board_parts.append('</div></section>')
 
-    columns, all_tags_norm = kb_parse.parse_board(
+    for kind, item in kb_cache.iter_board(
         markdown,
         meta,
         today,
+        config=config,
         allowed_tags=None,
         archive_keyword=ARCHIVE_COL_KEYWORD,
-    )
-    if not columns:
-        return markdown
-
-    # Resolver href por roots
-    for col in columns:
-        roots = ARCHIVE_DOC_ROOTS if col.get("archived") else DEFAULT_DOC_ROOTS
-        for c in col["cards"]:
-            if c.get("target"):
-                c["href"] = kb_links.resolve_wikilink_href(c["target"], page, files, config, roots)
-
-    # Sacar completadas a columna extra
-    done_cards = []
-    for col in columns:
-        keep = []
-        for c in col["cards"]:
+    ):
+        if kind == "column":
+            if col is not None and not virtual:
+                close_column()
+            col = item
+            col_cards = []
+            if vboard is not None:
+                vboard.add_column(col)
+            elif pending is not None:
+                pending.append((kind, col))
+            # Resolver href por roots
+            roots = ARCHIVE_DOC_ROOTS if col.get("archived") else DEFAULT_DOC_ROOTS
+            continue
+
+        c = item
+        all_tags_norm.update(c["tags_norm"])
+        if c.get("target"):
+            file_url = resolver.absolute_url(c["target"], roots)
+            c["href"] = resolver.relative_href(file_url, page)
+            card_links.append((c["target"], None, file_url))
+
+        if not virtual:
+            anchor = card_anchor(c["title"], anchors)
+            search_cards.append((anchor, c, col["title"]))
             if c.get("done"):
-                done_cards.append(c)
+                done_html.append(render_card(c, tag_colors, done_visual=True, client=client, anchor=anchor))
             else:
-                keep.append(c)
-        col["cards"] = keep
+                col_cards.append(render_card(c, tag_colors, done_visual=False, client=client, anchor=anchor))
+        else:
+            search_lines.append(card_search_line(c, col["title"]))
+        if vboard is not None:
+            vboard.add_card(c)
+        elif pending is not None:
+            pending.append((kind, c))
+
+        n_cards += 1
+        if virtual is None and n_cards > VIRTUAL_MIN_CARDS:
+            # demasiado grande: a partir de aquí solo el JSON
+            virtual = True
+            vboard = _VirtualBoard(tag_colors, client)
+            for ev_kind, ev in pending:
+                if ev_kind == "column":
+                    vboard.add_column(ev)
+                else:
+                    vboard.add_card(ev)
+            pending = None
+            search_lines = [card_search_line(sc, col_title) for _, sc, col_title in search_cards]
+            search_cards = []
+            board_parts.clear()
+            done_html.clear()
+            col_cards = []
+
+    kb_graph.set_page_links(page.file.src_uri, card_links)
+    if col is None:
+        return markdown
+    if not virtual:
+        close_column()
+
+    # `search:` del front matter puede no ser un dict (p. ej. "search: true")
+    search_meta = meta.get("search")
+    page.meta["search"] = {**(search_meta if isinstance(search_meta, dict) else {}), "exclude": True}
+    if virtual:
+        _SEARCH_CARDS[page.url] = (page, [], "\n".join(search_lines))
+    else:
+        _SEARCH_CARDS[page.url] = (page, [
+            search_entry(page.url, a, c, col_title) for a, c, col_title in search_cards
+        ], "")
 
     # filtros: separar users vs normales (colores salen del mismo json)
     all_users_norm = sorted([t for t in all_tags_norm if t in USER_TAG_SET])
@@ -96,8 +429,8 @@ def on_page_markdown(markdown, page, config, files, **kwargs):
         )
 
     out = []
-    out.append(KB_STYLE)
     out.append('<div class="kb-wrap" data-kb-wrap="1">')
+    out.append(kb_assets.stylesheet_tag(KB_CSS, page))
 
     # Toolbar
     out.append('<div class="kb-toolbar">')
@@ -168,88 +501,100 @@ def on_page_markdown(markdown, page, config, files, **kwargs):
     # ✅ IMPORTANTE: vuelve kb-bleed-right
     out.append('<div class="kb-board kb-bleed-right" data-kb-board="1">')
 
-    def render_card(c: dict, done_visual: bool = False) -> str:
-        done_cls = " kb-done" if done_visual else ""
-        data_title = escape(c["title"], quote=True)
-
-        tags_user_norm = [t for t in c["tags_norm"] if t in USER_TAG_SET]
-        tags_norm_only = [t for t in c["tags_norm"] if t not in USER_TAG_SET]
-
-        data_tags = escape(",".join(tags_norm_only), quote=True)
-        data_users = escape(",".join(tags_user_norm), quote=True)
-        data_dates = escape(",".join(c["dates_iso"]), quote=True)
-        data_statuses = escape(",".join(c["statuses"]), quote=True)
-        data_hasdates = "1" if c["has_dates"] else "0"
-
-        attrs = (
-            f' data-title="{data_title}"'
-            f' data-tags="{data_tags}"'
-            f' data-users="{data_users}"'
-            f' data-dates="{data_dates}"'
-            f' data-statuses="{data_statuses}"'
-            f' data-hasdates="{data_hasdates}"'
-        )
-
-        parts = []
-        if c.get("href"):
-            parts.append(f'<a class="kb-card{done_cls}" href="{escape(c["href"], quote=True)}"{attrs}>')
-        else:
-            parts.append(f'<article class="kb-card{done_cls}"{attrs}>')
-
-        parts.append(f'<div class="kb-card-title">{escape(c["title"])}</div>')
-
-        chips = []
-        for ds, st in c["date_items"]:
-            cls = f"kb-chip kb-date {st}" if st else "kb-chip kb-date"
-            chips.append(f'<span class="{cls}">{escape(ds)}</span>')
-
-        for tag in c["tags"]:
-            tnorm = norm_tag(tag)
-            style = tag_style(tag_colors, tag)
-
-            if tnorm in USER_TAG_SET:
-                chips.append(f'<span class="kb-chip kb-tag kb-user" style="{style}">@{escape(tag)}</span>')
-            else:
-                chips.append(f'<span class="kb-chip kb-tag" style="{style}">#{escape(tag)}</span>')
-
-        if chips:
-            parts.append('<div class="kb-meta">' + "".join(chips) + '</div>')
-
-        parts.append("</a>" if c.get("href") else "</article>")
-        return "".join(parts)
+    if virtual:
+        out.extend(vboard.board_html())
+    else:
+        out.extend(board_parts)
 
-    # columnas normales
-    for col in columns:
-        arch_cls = " kb-archived" if col.get("archived") else ""
-        out.append(f'<section class="kb-col{arch_cls}">')
-        out.append(f'<header class="kb-col-title">{escape(col["title"])}</header>')
+        # columna completadas (oculta por CSS hasta toggle)
+        out.append('<section class="kb-col kb-done-col">')
+        out.append('<header class="kb-col-title">Completadas</header>')
         out.append('<div class="kb-cards">')
 
-        if not col["cards"]:
+        if not done_html:
             out.append('<div class="kb-empty">—</div>')
         else:
-            for c in col["cards"]:
-                out.append(render_card(c, done_visual=False))
+            out.extend(done_html)
             out.append('<div class="kb-empty" data-kb-empty="filtered" style="display:none;">Sin resultados</div>')
 
         out.append('</div></section>')
 
-    # columna completadas (oculta por CSS hasta toggle)
-    out.append('<section class="kb-col kb-done-col">')
-    out.append('<header class="kb-col-title">Completadas</header>')
-    out.append('<div class="kb-cards">')
-
-    if not done_cards:
-        out.append('<div class="kb-empty">—</div>')
-    else:
-        for c in done_cards:
-            out.append(render_card(c, done_visual=True))
-        out.append('<div class="kb-empty" data-kb-empty="filtered" style="display:none;">Sin resultados</div>')
-
-    out.append('</div></section>')
-
     out.append('</div>')      # board
-    out.append(KB_SCRIPT)     # JS
+    if virtual:
+        out.append(vboard.island_html())
+    out.append(kb_assets.script_tag(FILTER_JS, page))
+    if virtual:
+        out.append(kb_assets.script_tag(KB_VIRTUAL_JS, page))
+    out.append(kb_assets.script_tag(KB_JS, page))     # JS
     out.append('</div>')      # wrap
 
     return "\n".join(out)
+
+
+def on_files(files, config, **kwargs):
+    kb_assets.add_to_files(files, config, (KB_CSS, FILTER_JS, KB_VIRTUAL_JS, KB_JS))
+    return files
+
+
+def on_env(env, config, files, **kwargs):
+    # todas las páginas ya han pasado por on_page_markdown: el grafo se monta
+    # con los enlaces que han ido dejando (con -v: resumen y los que no resuelven)
+    graph = kb_graph.get_graph(files)
+    log.debug("grafo de wikilinks: %s", graph.stats())
+    for src, target in graph.broken:
+        log.debug("wikilink sin página: [[%s]] en %s", target, graph.pages[src])
+    return env
+
+
+def on_pre_build(config, **kwargs):
+    kb_dates.reset_today()
+    # primer hook de mkdocs.yml: vacía las caches de build de todos los hooks
+    kb_registry.reset_build()
+
+
+def on_shutdown(**kwargs):
+    kb_registry.shutdown()
+
+
+def add_search_cards(config) -> int:
+    """
+    Añade a search_index.json la entrada de cada tablero y las de sus
+    tarjetas (la página antes que sus secciones: el buscador de Material lo
+    necesita así); en modo virtual las tarjetas van en el texto de la página.
+    Sin índice (plugin search desactivado) no hace nada.
+    """
+    boards = _SEARCH_CARDS.values()
+    if not boards:
+        return 0
+    path = Path(config["site_dir"]) / SEARCH_INDEX_PATH
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        docs = data["docs"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return 0
+
+    # las que ya estuvieran (build --dirty sobre un índice que no se ha reescrito)
+    urls = {page.url for page, _, _ in boards}
+    docs = [d for d in docs if d.get("location", "").partition("#")[0] not in urls]
+
+    added = 0
+    for page, entries, text in boards:
+        title = (page.meta or {}).get("title", page.title)
+        docs.append({"location": page.url, "title": escape(str(title or ""), quote=False), "text": text})
+        docs.extend(entries)
+        added += len(entries)
+    data["docs"] = docs
+    path.write_text(json.dumps(data, separators=(",", ":"), default=str), encoding="utf-8")
+    return added
+
+
+def on_post_build(config, **kwargs):
+    kb_cache.prune(config)
+    n_search = add_search_cards(config)
+    if n_search:
+        log.debug("search: %d tarjetas en el índice", n_search)
+    stats = kb_links.resolver_stats()
+    if stats is not None:
+        log.debug("wikilinks: %s", stats)
+    for cache_stats in kb_registry.stats():
+        log.debug("cache: %s", cache_stats)
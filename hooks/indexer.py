@@ -1,43 +1,25 @@
 from __future__ import annotations
 
-import re
 from pathlib import Path
 from datetime import date
-from typing import Iterable
 
-from mkdocs.utils import get_relative_url
+import cache_registry as kb_registry
+import dates as kb_dates
+import doc_meta as kb_meta
+import path_classifier as kb_paths
+import urls as kb_urls
 
-# Reutilizamos la misma idea de tags/fechas del kanban
-TAG_RE = re.compile(r"(?<!\w)#([\w\-_/]+)")
-DATE_RE = re.compile(r"@\{(\d{4}-\d{2}-\d{2})\}")
-H1_RE = re.compile(r"^#\s+(.+?)\s*$", re.M)
-
-_INDEX_CACHE: dict[int, list[dict]] = {}
+# por objeto Files: (roots, tags permitidas, hoy) -> metadatos (href aparte:
+# depende de la página)
+_INDEX_CACHE = kb_registry.files_cache("indexer.entries")
 
 
 def _norm_tag(tag: str) -> str:
     return tag.strip().lstrip("#").upper()
 
 
-def _read_title_from_md(path: str) -> str | None:
-    try:
-        txt = Path(path).read_text(encoding="utf-8", errors="ignore")
-    except Exception:
-        return None
-    m = H1_RE.search(txt)
-    if m:
-        return m.group(1).strip()
-    return None
-
-
-def _extract_tags_from_md(path: str, allowed_tags: set[str] | None) -> tuple[list[str], list[str]]:
+def _filter_tags(raw: list[str], allowed_tags: set[str] | None) -> tuple[list[str], list[str]]:
     """Devuelve (tags_display, tags_norm_filtradas)."""
-    try:
-        txt = Path(path).read_text(encoding="utf-8", errors="ignore")
-    except Exception:
-        return [], []
-    raw = TAG_RE.findall(txt) or []
-    # raw viene sin #
     tags_norm_all = sorted({_norm_tag(t) for t in raw})
     if allowed_tags is None:
         return raw, tags_norm_all
@@ -46,42 +28,6 @@ def _extract_tags_from_md(path: str, allowed_tags: set[str] | None) -> tuple[lis
     return tags_display, tags_norm
 
 
-def _extract_dates_from_md(path: str) -> list[str]:
-    try:
-        txt = Path(path).read_text(encoding="utf-8", errors="ignore")
-    except Exception:
-        return []
-    return [d.strip() for d in DATE_RE.findall(txt) or []]
-
-
-def _parse_date_iso(ds: str) -> date | None:
-    try:
-        y, m, d = ds.split("-")
-        return date(int(y), int(m), int(d))
-    except Exception:
-        return None
-
-
-def _date_status(due: date, today: date) -> str:
-    if due < today:
-        return "past"
-    delta = (due - today).days
-    if delta < 7:
-        return "soon"
-    return "later"
-
-
-def _starts_with_any(src_path: str, roots: Iterable[str]) -> bool:
-    sp = (src_path or "").replace("\\", "/")
-    for r in roots:
-        rr = (r or "").strip().strip("/")
-        if not rr:
-            continue
-        if sp.startswith(rr + "/") or sp == rr:
-            return True
-    return False
-
-
 def collect_index_entries(
     files,
     page,
@@ -90,6 +36,7 @@ def collect_index_entries(
     dev_roots: list[str],
     arch_roots: list[str],
     allowed_tags: set[str] | None,
+    config=None,
 ):
     """
     Devuelve una lista de entries:
@@ -104,66 +51,69 @@ def collect_index_entries(
       has_dates
     }
     """
-    cache_key = id(files)
-    if cache_key in _INDEX_CACHE:
-        # OJO: href depende de page.url -> recalculamos href pero reutilizamos metadatos
-        base = _INDEX_CACHE[cache_key]
-        out = []
-        for e in base:
-            out.append({**e, "href": get_relative_url(e["url"], page.url)})
-        return out
+    # OJO: href depende de page.url -> recalculamos href pero reutilizamos metadatos
+    # (grupos, tags filtradas y status dependen de los argumentos: van en la clave)
+    key = (
+        tuple(dev_roots),
+        tuple(arch_roots),
+        None if allowed_tags is None else frozenset(allowed_tags),
+        today,
+    )
+    by_args = _INDEX_CACHE.get_or_create(files, dict)
+    base_entries = by_args.get(key)
+    if base_entries is None:
+        base_entries = by_args[key] = _collect_base_entries(
+            files, today, dev_roots=dev_roots, arch_roots=arch_roots, allowed_tags=allowed_tags, config=config
+        )
 
-    base_entries: list[dict] = []
+    # devolvemos con href relativo
+    relative = kb_urls.for_page(page.url)
+    out = []
+    for e in base_entries:
+        out.append({**e, "href": relative(e["url"])})
+    return out
 
-    for f in files.documentation_pages():
-        src_path = getattr(f, "src_path", "") or ""
-        abs_src_path = getattr(f, "abs_src_path", "") or ""
-        url = getattr(f, "url", None)
-        if not url or not abs_src_path:
-            continue
 
-        sp = src_path.replace("\\", "/")
+def _collect_base_entries(
+    files,
+    today: date,
+    *,
+    dev_roots: list[str],
+    arch_roots: list[str],
+    allowed_tags: set[str] | None,
+    config=None,
+) -> list[dict]:
+    # título/tags/fechas de doc_meta: solo se leen las notas que han cambiado
+    base_entries: list[dict] = []
+    # dev antes que arch; aquí los roots siempre han distinguido mayúsculas
+    groups = kb_paths.from_groups({"dev": dev_roots, "arch": arch_roots}, ignore_case=False)
+
+    for doc in kb_meta.get_documents(files, config):
+        sp, url, meta = doc.src_uri, doc.url, doc.meta
 
-        group = None
-        if _starts_with_any(sp, dev_roots):
-            group = "dev"
-        elif _starts_with_any(sp, arch_roots):
-            group = "arch"
-        else:
+        group = groups.first(sp)
+        if group is None:
             continue
 
-        # Título
-        title = _read_title_from_md(abs_src_path) or Path(sp).stem
+        title, raw_tags, dates_iso = (meta.title, list(meta.tags), list(meta.dates_iso)) if meta else (None, [], [])
 
         # Tags (solo las permitidas)
-        tags_display, tags_norm = _extract_tags_from_md(abs_src_path, allowed_tags)
+        tags_display, tags_norm = _filter_tags(raw_tags, allowed_tags)
 
         # Fechas (para filtros)
-        dates_iso = _extract_dates_from_md(abs_src_path)
-        statuses = set()
-        for ds in dates_iso:
-            d = _parse_date_iso(ds)
-            if d:
-                statuses.add(_date_status(d, today))
+        statuses = kb_dates.statuses_for_isos(dates_iso, today.toordinal())
 
         base_entries.append(
             {
                 "group": group,
-                "title": title,
+                "title": title or Path(sp).stem,
                 "url": url,  # guardamos url “absoluta” de mkdocs; href se hace relativo al page.url
                 "tags_display": tags_display,
                 "tags_norm": tags_norm,
                 "dates_iso": dates_iso,
-                "statuses": sorted(statuses),
+                "statuses": statuses,
                 "has_dates": bool(dates_iso),
             }
         )
 
-    # cacheamos base
-    _INDEX_CACHE[cache_key] = base_entries
-
-    # devolvemos con href relativo
-    out = []
-    for e in base_entries:
-        out.append({**e, "href": get_relative_url(e["url"], page.url)})
-    return out
+    return base_entries
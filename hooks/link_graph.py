@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass, field
+
+import cache_registry as kb_registry
+
+# Grafo de wikilinks de todo el sitio, con los enlaces que los hooks ya
+# resuelven al pintar cada página (no se vuelve a leer ni a parsear nada):
+# - wikilinks.py: cada [[...]] que reescribe en una página normal (note_src)
+# - hook.py: el wikilink de cada tarjeta de un tablero (absolute_url con los
+#   roots de su columna)
+# Cada hook deja los de su página con set_page_links(); en on_env ya se han
+# procesado todas y get_graph() monta las adyacencias en arrays de enteros
+# (formato CSR): los enlaces de la página i son targets[offsets[i]:offsets[i + 1]].
+# Con `build --dirty` solo cuentan las páginas que se han vuelto a procesar.
+
+# src_uri de la página -> [(target, src_uri destino | None, url destino | None)]
+_LINKS = kb_registry.cache("link_graph.links")
+_GRAPHS = kb_registry.files_cache("link_graph")
+
+
+@dataclass(slots=True)
+class LinkGraph:
+    pages: list[str]                    # src_uri por id de nodo
+    urls: list[str]                     # url de mkdocs por id de nodo
+    fwd_offsets: array                  # salientes (sin repetir, ordenados)
+    fwd_targets: array
+    bwd_offsets: array                  # entrantes (backlinks)
+    bwd_sources: array
+    broken: list[tuple[int, str]]       # (página, nota / target de tarjeta) sin resolver
+    n_links: int = 0                    # wikilinks vistos (con repetidos y rotos)
+    _ids: dict[str, int] = field(default_factory=dict)
+
+    def id_of(self, src_uri: str) -> int | None:
+        return self._ids.get(src_uri)
+
+    def links_from(self, node: int) -> array:
+        return self.fwd_targets[self.fwd_offsets[node]:self.fwd_offsets[node + 1]]
+
+    def links_to(self, node: int) -> array:
+        return self.bwd_sources[self.bwd_offsets[node]:self.bwd_offsets[node + 1]]
+
+    def orphans(self) -> list[int]:
+        """Páginas a las que no apunta ningún wikilink."""
+        offs = self.bwd_offsets
+        return [i for i in range(len(self.pages)) if offs[i] == offs[i + 1]]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "pages": len(self.pages),
+            "links": self.n_links,
+            "edges": len(self.fwd_targets),
+            "broken": len(self.broken),
+            "orphans": len(self.orphans()),
+        }
+
+
+def set_page_links(src_uri: str, links: list[tuple[str, str | None, str | None]]) -> None:
+    """
+    Enlaces de una página, tal y como se han resuelto al pintarla: (target,
+    src_uri destino, url destino); los dos None si no ha resuelto.
+    """
+    _LINKS[src_uri] = links
+
+
+def _csr(n: int, edges: list[set[int]]) -> tuple[array, array]:
+    offsets = array("I", [0]) * (n + 1)
+    targets = array("I")
+    for i, outs in enumerate(edges):
+        targets.extend(sorted(outs))
+        offsets[i + 1] = len(targets)
+    return offsets, targets
+
+
+def _transpose(n: int, offsets: array, targets: array) -> tuple[array, array]:
+    counts = array("I", [0]) * (n + 1)
+    for t in targets:
+        counts[t + 1] += 1
+    for i in range(n):
+        counts[i + 1] += counts[i]
+    sources = array("I", [0]) * len(targets)
+    fill = array("I", counts)
+    for src in range(n):
+        for k in range(offsets[src], offsets[src + 1]):
+            t = targets[k]
+            sources[fill[t]] = src
+            fill[t] += 1
+    return counts, sources
+
+
+def build_graph(files) -> LinkGraph:
+    try:
+        docs = list(files.documentation_pages())
+    except Exception:
+        docs = []
+
+    pages = [(getattr(f, "src_uri", "") or "").replace("\\", "/") for f in docs]
+    urls = [getattr(f, "url", "") or "" for f in docs]
+    ids = {sp: i for i, sp in enumerate(pages)}
+    url_ids = {u: i for i, u in enumerate(urls) if u}
+
+    edges: list[set[int]] = []
+    broken: list[tuple[int, str]] = []
+    n_links = 0
+    for src, sp in enumerate(pages):
+        outs: set[int] = set()
+        for target, dst_src, dst_url in _LINKS.get(sp) or ():
+            n_links += 1
+            # la url "de convención" de un target sin página no está en url_ids
+            dst = ids.get(dst_src) if dst_src is not None else url_ids.get(dst_url)
+            if dst is None:
+                broken.append((src, target))
+            else:
+                outs.add(dst)
+        edges.append(outs)
+
+    n = len(pages)
+    fwd_offsets, fwd_targets = _csr(n, edges)
+    bwd_offsets, bwd_sources = _transpose(n, fwd_offsets, fwd_targets)
+    return LinkGraph(
+        pages=pages,
+        urls=urls,
+        fwd_offsets=fwd_offsets,
+        fwd_targets=fwd_targets,
+        bwd_offsets=bwd_offsets,
+        bwd_sources=bwd_sources,
+        broken=broken,
+        n_links=n_links,
+        _ids=ids,
+    )
+
+
+def get_graph(files) -> LinkGraph:
+    """El grafo del build actual (uno por objeto Files); desde on_env, con todas las páginas ya procesadas."""
+    return _GRAPHS.get_or_create(files, lambda: build_graph(files))
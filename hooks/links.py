@@ -1,14 +1,32 @@
 from __future__ import annotations
 
-from mkdocs.utils import get_relative_url
-
 import re
-from pathlib import Path
+import weakref
+from pathlib import Path, PurePath
+
+import cache_registry as kb_registry
+import urls as kb_urls
 
 WIKILINK_RE = re.compile(r"\[\[([^\]|]+)(\|([^\]]+))?\]\]")
 
-# ✅ Cache por build para no recalcular el índice en cada página
-_WIKILINK_INDEX_CACHE: dict[int, dict[str, list[dict]]] = {}
+# Wikilinks del markdown de una página normal, en una sola pasada: los bloques
+# de código (``` / ~~~) y el código inline también casan (grupos fence/code)
+# para poder saltarlos, y los embeds ![[...]] llevan embed="!". Lo comparten
+# wikilinks.py (que los reescribe) y link_graph.py (que los cuenta).
+PAGE_WIKILINK_RE = re.compile(
+    r"(?P<fence>^[ \t]*(?P<fc>`{3,}|~{3,}).*?(?:\n[ \t]*(?P=fc)[`~]*[ \t]*(?=\n|\Z)|\Z))"
+    r"|(?P<code>(?P<bt>`+)(?-s:.+?)(?<!`)(?P=bt)(?!`))"
+    r"|(?P<embed>!?)\[\[(?P<target>[^\]|\n]+)(?:\|(?P<label>[^\]\n]+))?\]\]",
+    re.M | re.S,
+)
+
+# Un resolver por objeto Files (ver get_resolver); guarda el índice por nombre
+_RESOLVERS = kb_registry.files_cache("links.resolver")
+# roots (en orden) -> prefijos "root/" en minúsculas; hay pocos distintos (los
+# de hook.py y una carpeta por página en wikilinks/link_graph)
+_ROOT_PREFIXES = kb_registry.cache("links.root_prefixes", maxsize=4096)
+
+_MISSING = object()
 
 
 def extract_first_wikilink(raw: str):
@@ -21,6 +39,13 @@ def extract_first_wikilink(raw: str):
     return target, label
 
 
+def split_page_target(raw: str) -> tuple[str, str]:
+    """[[Nota#Sección]] -> ("Nota", "Sección"); [[Nota\\|Texto]] (en tablas) sin la "\\"."""
+    raw = raw[:-1] if raw.endswith("\\") else raw
+    name, _, heading = raw.partition("#")
+    return name.strip(), heading.strip()
+
+
 def _norm_key(name: str) -> str:
     """
     Normalización “tipo obsidian” (bastante permisiva):
@@ -65,16 +90,6 @@ def _build_wikilink_index(files) -> dict[str, list[dict]]:
     return idx
 
 
-def _get_index(files) -> dict[str, list[dict]]:
-    """
-    Cachea el índice por identidad del objeto `files`.
-    """
-    k = id(files)
-    if k not in _WIKILINK_INDEX_CACHE:
-        _WIKILINK_INDEX_CACHE[k] = _build_wikilink_index(files)
-    return _WIKILINK_INDEX_CACHE[k]
-
-
 def candidate_paths_for_target(target: str, roots: list[str]):
     t = (target or "").strip().lstrip("/")
     if not t:
@@ -116,61 +131,163 @@ def _pick_best_match(candidates: list[dict], roots: list[str]) -> dict | None:
     """
     if not candidates:
         return None
-
-    # normalizamos roots para comparar
-    roots_norm = [(r.strip().strip("/").lower() + "/") for r in (roots or []) if r.strip().strip("/")]
-    if roots_norm:
-        for r in roots_norm:
-            for c in candidates:
-                sp = (c.get("src_path") or "").lower()
-                if sp.startswith(r):
-                    return c
+    if len(candidates) == 1 or not roots:
+        return candidates[0]
+
+    # roots normalizados una vez por lista de roots (no en cada llamada)
+    for r in _root_prefixes(tuple(roots)):
+        for c in candidates:
+            sp = (c.get("src_path") or "").lower()
+            if sp.startswith(r):
+                return c
     return candidates[0]
 
 
-def resolve_wikilink_href(target: str, page, files, config, roots: list[str]) -> str | None:
+def _root_prefixes(roots: tuple[str, ...]) -> tuple[str, ...]:
+    prefixes = _ROOT_PREFIXES.get(roots)
+    if prefixes is None:
+        prefixes = _ROOT_PREFIXES[roots] = tuple(
+            r.strip().strip("/").lower() + "/" for r in roots if r.strip().strip("/")
+        )
+    return prefixes
+
+
+class WikilinkResolver:
     """
-    Resuelve [[X]] a url:
-    1) intenta por ruta (roots + target.md / target/index.md)
-    2) si falla, busca por nombre en todo el sitio (índice), y elige la mejor coincidencia por roots
+    Resolución de [[X]] para todo un build. Mismo orden que siempre:
+    1) por ruta (target.md / target/index.md, sin root y con cada root)
+    2) por nombre en el índice de páginas, eligiendo por roots
+    3) la url "de convención" bajo el primer root
+
+    El mapa src_uri -> url se monta una vez, y (target, roots) -> url absoluta
+    se memoiza: un tablero con cientos de tarjetas al mismo documento solo
+    resuelve la ruta una vez; la url relativa sale de urls.py (memoizada por carpeta).
     """
-    if not target:
-        return None
-
-    # --- 1) intento por ruta (rápido)
-    candidates = candidate_paths_for_target(target, roots)
 
-    file_url = None
-    for c in candidates:
-        try:
-            f = files.get_file_from_path(c)
-            if f:
-                file_url = getattr(f, "url", None)
-                if file_url:
-                    break
-        except Exception:
-            pass
-
-    # --- 2) fallback por índice (encuentra research/desarrollos/..., etc.)
-    if not file_url:
-        idx = _get_index(files)
-        key = _norm_key(target)
-        matches = idx.get(key, [])
-        best = _pick_best_match(matches, roots)
+    def __init__(self, files, config):
+        # débil: la caché del registro va por Files y no debe mantenerlo vivo
+        self._files = weakref.ref(files)
+        self.use_directory_urls = bool(config.get("use_directory_urls", True))
+        # como files.get_file_from_path, pero sin los ficheros sin url
+        self.path_map: dict[str, str] = {}
+        for src_uri, f in files.src_uris.items():
+            url = getattr(f, "url", None)
+            if url:
+                self.path_map[src_uri] = url
+        self._index: dict[str, list[dict]] | None = None
+        self._memo: dict[tuple[str, tuple[str, ...]], str] = {}
+        self._notes: dict[tuple[str, str], str | None] = {}  # (target, carpeta) -> src_uri
+        self._note_targets: dict[str, tuple[tuple[str, ...], list[dict]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.by_path = 0
+        self.by_name = 0
+        self.by_convention = 0
+
+    @property
+    def index(self) -> dict[str, list[dict]]:
+        if self._index is None:
+            self._index = _build_wikilink_index(self._files())
+        return self._index
+
+    def absolute_url(self, target: str, roots: list[str]) -> str:
+        key = (target, tuple(roots or ()))
+        url = self._memo.get(key)
+        if url is not None:
+            self.hits += 1
+            return url
+        self.misses += 1
+        url = self._memo[key] = self._resolve(target, roots)
+        return url
+
+    def _resolve(self, target: str, roots: list[str]) -> str:
+        # --- 1) intento por ruta
+        for c in candidate_paths_for_target(target, roots):
+            url = self.path_map.get(PurePath(c).as_posix())
+            if url:
+                self.by_path += 1
+                return url
+
+        # --- 2) fallback por índice (encuentra research/desarrollos/..., etc.)
+        best = _pick_best_match(self.index.get(_norm_key(target), []), roots)
         if best:
-            file_url = best["url"]
+            self.by_name += 1
+            return best["url"]
 
-    # --- 3) fallback convención si todo falla
-    if not file_url:
-        use_dir = bool(config.get("use_directory_urls", True))
+        # --- 3) fallback convención si todo falla
+        self.by_convention += 1
         base = target.strip().lstrip("/")
         if base.lower().endswith(".md"):
             base = base[:-3]
         if roots and roots[0]:
             base = f"{roots[0].strip().strip('/')}/{base}".strip("/")
-        file_url = base.rstrip("/") + ("/" if use_dir else ".html")
+        return base.rstrip("/") + ("/" if self.use_directory_urls else ".html")
+
+    def note_src(self, target: str, folder: str) -> str | None:
+        """
+        src_uri de la nota a la que apunta [[target]] desde una página de
+        `folder` (o None). Para páginas normales: por ruta y si no por nombre,
+        prefiriendo la misma carpeta; sin url "de convención".
+        """
+        key = (target, folder)
+        src = self._notes.get(key, _MISSING)
+        if src is not _MISSING:
+            self.hits += 1
+            return src
+        self.misses += 1
+
+        # lo que solo depende del target se calcula una vez por target
+        info = self._note_targets.get(target)
+        if info is None:
+            paths = tuple(PurePath(c).as_posix() for c in candidate_paths_for_target(target, []))
+            info = self._note_targets[target] = (paths, self.index.get(_norm_key(target), []))
+        paths, matches = info
+
+        src = None
+        for c in paths + tuple(f"{folder}/{c}" for c in paths if folder):
+            if c in self.path_map:
+                self.by_path += 1
+                src = c
+                break
+        else:
+            if matches:
+                self.by_name += 1
+                best = matches[0] if len(matches) == 1 else _pick_best_match(matches, [folder] if folder else [])
+                src = best["src_path"]
+        self._notes[key] = src
+        return src
+
+    def href(self, target: str, page, roots: list[str]) -> str | None:
+        """Url de [[target]] relativa a `page`."""
+        if not target:
+            return None
+        return self.relative_href(self.absolute_url(target, roots), page)
+
+    @staticmethod
+    def relative_href(file_url: str, page) -> str:
+        """`file_url` (de absolute_url) relativa a `page`."""
+        try:
+            return kb_urls.relative_url(file_url, page.url)
+        except Exception:
+            return file_url
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "targets": len(self._memo) + len(self._notes),
+            "hits": self.hits,
+            "misses": self.misses,
+            "by_path": self.by_path,
+            "by_name": self.by_name,
+            "by_convention": self.by_convention,
+        }
+
+
+def get_resolver(files, config) -> WikilinkResolver:
+    """El resolver del build actual; se rehace si cambia el objeto `files`."""
+    return _RESOLVERS.get_or_create(files, lambda: WikilinkResolver(files, config))
+
+
+def resolver_stats() -> dict[str, int] | None:
+    resolver = _RESOLVERS.last()
+    return resolver.stats() if resolver is not None else None
 
-    try:
-        return get_relative_url(file_url, page.url)
-    except Exception:
-        return file_url
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+
+
+class _DictAccess:
+    """
+    Acceso tipo dict (c["title"], c.get("href"), c["href"] = ...) para el código
+    que todavía trabaja con las tarjetas/columnas como diccionarios.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str):
+        if key not in self._keys:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value) -> None:
+        if key not in self._keys:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key) -> bool:
+        return key in self._keys
+
+    def get(self, key: str, default=None):
+        if key not in self._keys:
+            return default
+        return getattr(self, key)
+
+    def keys(self):
+        return iter(self._keys)
+
+    def items(self):
+        return ((k, getattr(self, k)) for k in self._keys)
+
+
+@dataclass(slots=True)
+class Card(_DictAccess):
+    """
+    Tarjeta del kanban. Los campos de listas son tuplas y los tags/fechas se
+    internan, así que las tarjetas de un tablero comparten sus strings.
+    """
+
+    done: bool
+    title: str
+    target: str | None                              # para resolver href luego
+    href: str | None                                # se rellena en hook.py
+    date_items: tuple[tuple[str, str | None], ...]
+    tags: tuple[str, ...]                           # ya filtradas si allowed_tags
+    tags_norm: tuple[str, ...]                      # para filtros UI
+    dates_iso: tuple[str, ...]
+    statuses: tuple[str, ...]
+
+    _keys = (
+        "done", "title", "target", "href", "date_items",
+        "tags", "tags_norm", "dates_iso", "statuses", "has_dates",
+    )
+
+    @property
+    def has_dates(self) -> bool:
+        return bool(self.dates_iso)
+
+    def as_dict(self) -> dict:
+        """Formato clásico (dict con listas) de parse_board."""
+        return {
+            "done": self.done,
+            "title": self.title,
+            "target": self.target,
+            "href": self.href,
+            "date_items": list(self.date_items),
+            "tags": list(self.tags),
+            "tags_norm": list(self.tags_norm),
+            "dates_iso": list(self.dates_iso),
+            "statuses": list(self.statuses),
+            "has_dates": self.has_dates,
+        }
+
+
+@dataclass(slots=True)
+class Column(_DictAccess):
+    title: str
+    archived: bool
+    cards: list[Card]
+
+    _keys = ("title", "cards", "archived")
+
+    def as_dict(self) -> dict:
+        return {
+            "title": self.title,
+            "cards": [c.as_dict() for c in self.cards],
+            "archived": self.archived,
+        }
+
+
+def intern_all(values) -> tuple[str, ...]:
+    return tuple(map(sys.intern, values))
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import parse as kb_parse
+
+# Un barrido barato por página para saber qué hooks tienen algo que hacer.
+# Son condiciones necesarias: si una no se cumple, el hook correspondiente no
+# puede cambiar nada y devuelve el markdown tal cual.
+DIRINDEX_PROBE = "AUTO:DIRINDEX"
+CALLOUT_PROBE = "[!"
+WIKILINK_PROBE = "[["
+
+
+@dataclass(frozen=True, slots=True)
+class PageFeatures:
+    kanban: bool        # tablero de Obsidian Kanban (hook.py)
+    dirindex: bool      # <!-- AUTO:DIRINDEX X --> (dir_index.py)
+    callouts: bool      # > [!tipo] (callouts.py)
+    wikilinks: bool     # [[nota]] (wikilinks.py)
+
+    @property
+    def any(self) -> bool:
+        return self.kanban or self.dirindex or self.callouts or self.wikilinks
+
+
+def scan_page(markdown: str, page=None) -> PageFeatures:
+    """
+    Clasifica la página. El resultado se guarda en la propia page y se reutiliza
+    mientras los hooks sigan pasándose el mismo markdown (mismo objeto): solo se
+    vuelve a escanear si un hook anterior lo ha reescrito.
+    """
+    cached = getattr(page, "_kb_features", None)
+    if cached is not None and cached[0] is markdown:
+        return cached[1]
+
+    md = markdown or ""
+    meta = getattr(page, "meta", {}) or {}
+    features = PageFeatures(
+        kanban=kb_parse.is_obsidian_kanban_board(md, meta),   # solo mira las 30 primeras líneas
+        dirindex=DIRINDEX_PROBE in md,
+        callouts=CALLOUT_PROBE in md,
+        wikilinks=WIKILINK_PROBE in md,
+    )
+
+    if page is not None:
+        try:
+            page._kb_features = (markdown, features)
+        except AttributeError:
+            pass
+    return features
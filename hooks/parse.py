@@ -1,32 +1,70 @@
 from __future__ import annotations
 
 import re
-from datetime import datetime, date
-from zoneinfo import ZoneInfo
+import sys
+from datetime import date
+from itertools import chain
+from typing import Iterable, Iterator
 
+import dates as kb_dates
+from model import Card, Column, intern_all
 from tag_colors import norm_tag
 
+# Súbelo si cambia lo que produce iter_board_tokens (invalida la caché en disco)
+PARSER_VERSION = 1
+
 H2_RE = re.compile(r"^##\s+(.*)\s*$")
 TASK_RE = re.compile(r"^\s*-\s*\[( |x|X)\]\s*(.*)$")
 DATE_RE = re.compile(r"@\{(\d{4}-\d{2}-\d{2})\}")
 WIKILINK_RE = re.compile(r"\[\[([^\]|]+)(\|([^\]]+))?\]\]")
 OBSIDIAN_COMMENT_RE = re.compile(r"%%.*?%%", flags=re.S)
+KANBAN_SETTINGS_COMMENT_RE = re.compile(r"%%\s*kanban:settings.*?%%", flags=re.S | re.I)
+KANBAN_SETTINGS_FENCE_RE = re.compile(r"```.*?kanban:settings.*?```", flags=re.S | re.I)
+
+# Los dos de arriba documentan la semántica; el recorte real lo hacen las
+# máquinas de estados de más abajo (las regex son cuadráticas con un %% o un
+# ``` sin cerrar).
+_SETTINGS_KEY = "kanban:settings"
+_SETTINGS_KEY_RE = re.compile(re.escape(_SETTINGS_KEY), flags=re.I)
+_SETTINGS_KEY_STARTS = "kK\u212a"    # lo que casa con "k" bajo re.I
+_NON_SPACE_RE = re.compile(r"\S")
+
+# Tokenizador de una sola pasada para las líneas de tarea:
+# wikilink | fecha | tag (el lookbehind de los tags se comprueba a mano)
+CARD_TOKEN_RE = re.compile(
+    r"\[\[(?P<target>[^\]|]+)(?:\|(?P<label>[^\]]+))?\]\]"
+    r"|@\{(?P<date>\d{4}-\d{2}-\d{2})\}"
+    r"|#(?P<tag>[\w\-_/]+)"
+)
 
 
 def strip_obsidian_comments(md: str) -> str:
-    return re.sub(OBSIDIAN_COMMENT_RE, "", md)
+    """Igual que OBSIDIAN_COMMENT_RE.sub("", md), pero lineal y sin regex."""
+    return "".join(_iter_without_comments((md,)))
 
 
 def strip_kanban_settings(md: str) -> str:
-    md = re.sub(r"%%\s*kanban:settings.*?%%", "", md, flags=re.S | re.I)
-    md = re.sub(r"```.*?kanban:settings.*?```", "", md, flags=re.S | re.I)
-    return md
+    """
+    Igual que aplicar KANBAN_SETTINGS_COMMENT_RE y luego KANBAN_SETTINGS_FENCE_RE,
+    pero en tiempo lineal aunque haya un %% o un ``` sin cerrar.
+    """
+    if _SETTINGS_KEY_RE.search(md) is None:
+        return md
+    return "".join(_iter_without_settings_fences(_iter_without_settings_comments((md,))))
 
 
 def is_obsidian_kanban_board(markdown: str, page_meta: dict) -> bool:
     if (page_meta or {}).get("kanban-plugin") == "board":
         return True
-    head = "\n".join(markdown.splitlines()[:30]).lower()
+    # solo hace falta el principio: las 30 primeras líneas acaban, como muy
+    # tarde, en el salto de línea número 30
+    end = -1
+    for _ in range(30):
+        end = markdown.find("\n", end + 1)
+        if end == -1:
+            break
+    head_src = markdown if end == -1 else markdown[:end]
+    head = "\n".join(head_src.splitlines()[:30]).lower()
     return "kanban-plugin:" in head and "board" in head
 
 
@@ -53,58 +91,463 @@ def extract_tags(text: str):
     return tags, text
 
 
-def parse_date(d: str) -> date | None:
-    try:
-        return datetime.strptime(d, "%Y-%m-%d").date()
-    except Exception:
-        return None
+def _tokenize_card_line_slow(raw_line: str):
+    """Camino clásico (varias pasadas). Se usa como referencia en casos raros."""
+    target = extract_first_wikilink_target(raw_line)
+    dates, rest = extract_dates(wikilinks_to_text(raw_line))
+    tags_raw, title_txt = extract_tags(rest)
+    return title_txt, target, dates, tags_raw
+
+
+def tokenize_card_line(raw_line: str):
+    """
+    Lee la línea de tarea una sola vez y devuelve (title, target, dates, tags_raw).
+
+    Equivale a encadenar extract_first_wikilink_target + wikilinks_to_text +
+    extract_dates + extract_tags. Cuando un token queda pegado a otro de forma
+    que las pasadas clásicas darían otro resultado (tag unido a una fecha o a
+    un wikilink, fechas/tags dentro del label de un wikilink...), se delega en
+    el camino clásico para que el resultado sea idéntico.
+    """
+    parts = []
+    dates = []
+    tags = []
+    target = None
+    seen_link = False
+
+    prev = ""          # último carácter del texto ya sin fechas (lookbehind de tags)
+    tag_end = -1       # fin del último tag aceptado
+    link_end = 0       # fin del último wikilink
+    pos = 0
+
+    for m in CARD_TOKEN_RE.finditer(raw_line):
+        link_target, label, ds, tag = m.groups()
+        start, end = m.span()
+        if start > pos:
+            seg = raw_line[pos:start]
+            parts.append(seg)
+            prev = seg[-1]
+        elif start == tag_end and tag is None:
+            # tag pegado a una fecha/wikilink: al quitarla se uniría con lo siguiente
+            return _tokenize_card_line_slow(raw_line)
+
+        if tag is not None:
+            if prev and (prev.isalnum() or prev == "_"):
+                # (?<!\w)#... no casa: se queda como texto
+                parts.append(m.group(0))
+            else:
+                tags.append(tag)
+                tag_end = end
+            prev = tag[-1]
+            pos = end
+            continue
+
+        if start and raw_line[start - 1] == "#":
+            # "#" suelto delante de una fecha/wikilink: podría formar un tag
+            return _tokenize_card_line_slow(raw_line)
+
+        if ds is not None:
+            dates.append(ds)
+            pos = end
+            continue
+
+        label = label or link_target
+        if "#" in label or "@" in label or raw_line.rfind("@", max(link_end, start - 12), start) != -1:
+            # tags/fechas que nacen (o se cortan) dentro del label
+            return _tokenize_card_line_slow(raw_line)
+
+        if not seen_link:
+            seen_link = True
+            target = link_target.strip() or None
+
+        parts.append(label)
+        prev = label[-1]
+        pos = link_end = end
+
+    if pos == 0:
+        title_txt = raw_line
+    else:
+        parts.append(raw_line[pos:])
+        title_txt = "".join(parts)
+
+    return title_txt.strip(), target, dates, tags
 
 
 def today_madrid() -> date:
-    return datetime.now(ZoneInfo("Europe/Madrid")).date()
+    return kb_dates.today()
+
+
+# =========================================================
+# STREAMING (iter_board)
+# =========================================================
+
+def _iter_chunks(source: str | Iterable[str]) -> Iterator[str]:
+    """Trocea la entrada por líneas sin copiar el documento entero."""
+    if not isinstance(source, str):
+        for chunk in source:
+            if chunk:
+                yield chunk
+        return
+
+    start = 0
+    end = len(source)
+    while start < end:
+        nl = source.find("\n", start)
+        if nl == -1:
+            yield source[start:]
+            return
+        yield source[start:nl + 1]
+        start = nl + 1
+
+
+def _peek_head(chunks: Iterator[str], n: int = 30) -> tuple[str, Iterator[str]]:
+    """Lee lo justo para tener las n primeras líneas y devuelve (head, chunks)."""
+    seen = []
+    for chunk in chunks:
+        seen.append(chunk)
+        if len("".join(seen).splitlines()) > n:
+            break
+    return "".join(seen), chain(seen, chunks)
+
+
+def _iter_without_comments(chunks: Iterable[str]) -> Iterator[str]:
+    """Equivalente en streaming a strip_obsidian_comments (%%...%%)."""
+    in_comment = False
+    held = []      # comentario abierto: si no se cierra, se devuelve tal cual
+    carry = ""     # "%" final que podría formar "%%" con el siguiente trozo
+
+    for chunk in chunks:
+        text = carry + chunk if carry else chunk
+        carry = ""
+        pos = 0
+        while True:
+            i = text.find("%%", pos)
+            if i == -1:
+                rest = text[pos:]
+                if rest.endswith("%"):
+                    rest, carry = rest[:-1], "%"
+                if in_comment:
+                    held.append(rest)
+                elif rest:
+                    yield rest
+                break
+
+            if in_comment:
+                in_comment = False
+                held = []
+            else:
+                if i > pos:
+                    yield text[pos:i]
+                in_comment = True
+                held = ["%%"]
+            pos = i + 2
 
+    if in_comment:
+        yield "".join(held) + carry
+    elif carry:
+        yield carry
 
-def date_status(due: date, today: date) -> str:
-    if due < today:
-        return "past"
-    delta = (due - today).days
-    if delta < 7:
-        return "soon"
-    return "later"
 
+def _partial_suffix(text: str, trigger: str, start: int) -> int:
+    """Largo del final de text[start:] que es un prefijo propio de trigger."""
+    for k in range(len(trigger) - 1, 0, -1):
+        if len(text) - start >= k and text.endswith(trigger[:k]):
+            return k
+    return 0
 
-def parse_board(
-    markdown: str,
+
+def _iter_without_settings_comments(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Equivalente en streaming a KANBAN_SETTINGS_COMMENT_RE.sub("", texto)
+    (%% + espacios + kanban:settings ... %%), en tiempo lineal.
+
+    Estados: "out" (texto normal), "run" (espacios tras un %% candidato),
+    "key" (comparando kanban:settings) y "close" (buscando el %% de cierre).
+    Cada carácter se mira un número acotado de veces: el único texto que se
+    vuelve a leer es el arrastre de menos de 15 caracteres entre trozos.
+    """
+    key_len = len(_SETTINGS_KEY)
+    state = "out"
+    held = []          # texto desde el %% candidato; se devuelve si no casa
+    run_empty = True   # el %% candidato va pegado a lo que le sigue
+    carry = ""         # texto aún sin decidir que pasa al siguiente trozo
+
+    def step(text: str, eof: bool) -> Iterator[str]:
+        nonlocal state, held, run_empty, carry
+        pos = 0
+        n = len(text)
+        while True:
+            if state == "out":
+                i = text.find("%%", pos)
+                # descarte rápido: tras el %% tiene que venir un espacio o la "k"
+                while i != -1 and i + 2 < n:
+                    nxt = text[i + 2]
+                    if nxt in _SETTINGS_KEY_STARTS or nxt.isspace():
+                        break
+                    i = text.find("%%", i + 1)
+                if i == -1:
+                    cut = n if eof else n - _partial_suffix(text, "%%", pos)
+                    if cut > pos:
+                        yield text[pos:cut]
+                    carry = text[cut:]
+                    return
+                if i > pos:
+                    yield text[pos:i]
+                state, held, run_empty = "run", ["%%"], True
+                pos = i + 2
+
+            elif state == "run":
+                m = _NON_SPACE_RE.search(text, pos)
+                j = m.start() if m else n
+                if j > pos:
+                    held.append(text[pos:j])
+                    run_empty = False
+                if m is None:
+                    if eof:
+                        yield "".join(held)
+                        state = "out"
+                    return
+                state = "key"
+                pos = j
+
+            elif state == "key":
+                if n - pos < key_len and not eof:
+                    carry = text[pos:]
+                    return
+                m = _SETTINGS_KEY_RE.match(text, pos)
+                if m:
+                    held.append(text[pos:m.end()])
+                    state = "close"
+                    pos = m.end()
+                elif run_empty and text[pos] == "%":
+                    # "%%%": el siguiente candidato empieza en el segundo "%"
+                    yield "%"
+                    held = ["%%"]
+                    state = "run"
+                    pos += 1
+                else:
+                    yield "".join(held)
+                    state = "out"
+
+            else:  # close
+                c = text.find("%%", pos)
+                if c == -1:
+                    cut = n if eof else n - _partial_suffix(text, "%%", pos)
+                    held.append(text[pos:cut])
+                    carry = text[cut:]
+                    if eof:
+                        yield "".join(held)
+                        state = "out"
+                    return
+                held = []
+                state = "out"
+                pos = c + 2
+
+    for chunk in chunks:
+        if state == "out" and not carry and "%" not in chunk:
+            # camino rápido: trozo sin nada que pueda empezar un %%
+            yield chunk
+            continue
+        text = carry + chunk if carry else chunk
+        carry = ""
+        yield from step(text, False)
+    if carry or state != "out":
+        text, carry = carry, ""
+        yield from step(text, True)
+
+
+def _iter_without_settings_fences(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Equivalente en streaming a KANBAN_SETTINGS_FENCE_RE.sub("", texto)
+    (``` ... kanban:settings ... ```), en tiempo lineal.
+
+    Desde el primer ``` se retiene el texto hasta ver kanban:settings y el ```
+    de cierre; entre trozos solo se arrastra el solape justo para no partir
+    una de esas marcas.
+    """
+    key_len = len(_SETTINGS_KEY)
+    state = "out"      # "out" | "key" | "close"
+    held = []
+    carry = ""
+
+    def step(text: str, eof: bool) -> Iterator[str]:
+        nonlocal state, held, carry
+        pos = 0
+        n = len(text)
+        while True:
+            if state == "out":
+                i = text.find("```", pos)
+                if i == -1:
+                    cut = n if eof else n - _partial_suffix(text, "```", pos)
+                    if cut > pos:
+                        yield text[pos:cut]
+                    carry = text[cut:]
+                    return
+                if i > pos:
+                    yield text[pos:i]
+                state, held = "key", ["```"]
+                pos = i + 3
+
+            elif state == "key":
+                m = _SETTINGS_KEY_RE.search(text, pos)
+                if m is None:
+                    cut = n if eof else max(pos, n - key_len + 1)
+                    held.append(text[pos:cut])
+                    carry = text[cut:]
+                    if eof:
+                        # sin kanban:settings no puede casar nada más adelante
+                        yield "".join(held)
+                        state = "out"
+                    return
+                held.append(text[pos:m.end()])
+                state = "close"
+                pos = m.end()
+
+            else:  # close
+                c = text.find("```", pos)
+                if c == -1:
+                    cut = n if eof else n - _partial_suffix(text, "```", pos)
+                    held.append(text[pos:cut])
+                    carry = text[cut:]
+                    if eof:
+                        yield "".join(held)
+                        state = "out"
+                    return
+                held = []
+                state = "out"
+                pos = c + 3
+
+    for chunk in chunks:
+        if state == "out" and not carry and "`" not in chunk:
+            # camino rápido: trozo sin nada que pueda empezar un ```
+            yield chunk
+            continue
+        text = carry + chunk if carry else chunk
+        carry = ""
+        yield from step(text, False)
+    if carry or state != "out":
+        text, carry = carry, ""
+        yield from step(text, True)
+
+
+def _iter_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """Como str.splitlines(), pero sobre trozos."""
+    pending = ""
+    for chunk in chunks:
+        pending = pending + chunk if pending else chunk
+        if pending.endswith("\n"):
+            # todas las líneas están completas
+            yield from pending.splitlines()
+            pending = ""
+            continue
+
+        parts = pending.splitlines(True)
+        if not parts:
+            continue
+        # la última puede estar a medias (o ser un "\r" al que le sigue "\n")
+        pending = parts.pop()
+        for line in parts:
+            yield line[:-2] if line.endswith("\r\n") else line[:-1]
+
+    if pending:
+        yield pending.splitlines()[0]
+
+
+def _iter_clean_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """Líneas del tablero sin comentarios ni bloques kanban:settings."""
+    chunks = _iter_without_comments(chunks)
+    chunks = _iter_without_settings_comments(chunks)
+    chunks = _iter_without_settings_fences(chunks)
+    return _iter_lines(chunks)
+
+
+def card_from_tokens(
+    done: bool,
+    title: str,
+    target: str | None,
+    dated: list[tuple[str, int | None]],
+    tags: list[str],
+    tags_norm: list[str],
+    today: date | kb_dates.StatusTable,
+) -> Card:
+    """
+    Monta la Card a partir de lo ya tokenizado. `dated` son pares (fecha, ordinal)
+    con ordinal None si la fecha no es válida: los status se calculan aquí porque
+    dependen del día del build. `today` puede ser la fecha o su StatusTable.
+    """
+    statuses = today if isinstance(today, kb_dates.StatusTable) else kb_dates.status_table(today.toordinal())
+    date_items = []
+    statuses_set = set()
+    dates_iso = []
+
+    for ds, ordinal in dated:
+        ds = sys.intern(ds)
+        if ordinal is not None:
+            st = statuses[ordinal]
+            statuses_set.add(st)
+            dates_iso.append(ds)
+            date_items.append((ds, st))
+        else:
+            date_items.append((ds, None))
+
+    return Card(
+        done=done,
+        title=title,
+        target=target,
+        href=None,
+        date_items=tuple(date_items),
+        tags=intern_all(tags),
+        tags_norm=intern_all(tags_norm),
+        dates_iso=tuple(dates_iso),
+        statuses=tuple(sorted(statuses_set)),
+    )
+
+
+def tokenize_card(raw_line: str, allowed_tags: set[str] | None):
+    """Devuelve (title, target, dated, tags_display, tags_norm) de una línea de tarea."""
+    title_txt, target, dates, tags_raw = tokenize_card_line(raw_line)
+    title_txt = title_txt.strip(" -") or "(sin título)"
+
+    # tags: normaliza y filtra si allowed_tags
+    tags_norm_all = sorted({norm_tag(x) for x in tags_raw})
+    if allowed_tags is not None:
+        tags_norm = [t for t in tags_norm_all if t in allowed_tags]
+        tags_display = [t for t in tags_raw if norm_tag(t) in allowed_tags]
+    else:
+        tags_norm = tags_norm_all
+        tags_display = tags_raw
+
+    dated = [(ds, kb_dates.iso_to_ordinal(ds)) for ds in dates]
+
+    return title_txt, target, dated, tags_display, tags_norm
+
+
+def iter_board_tokens(
+    source: str | Iterable[str],
     page_meta: dict,
-    today: date,
     *,
     allowed_tags: set[str] | None = None,
     archive_keyword: str = "archiv",
 ):
     """
-    Devuelve (columns, all_tags_norm)
-    columns: [{title, archived, cards:[...]}]
-    card: {done,title,target,href?,date_items,tags,tags_norm,dates_iso,statuses,has_dates}
+    Como iter_board, pero sin depender del día del build: las tarjetas salen
+    como tuplas (done, title, target, dated, tags, tags_norm) que card_from_tokens
+    convierte en Card. Es lo que guarda la caché de tableros.
     """
-    if not is_obsidian_kanban_board(markdown, page_meta):
-        return [], set()
-
-    md = strip_kanban_settings(strip_obsidian_comments(markdown))
+    head, chunks = _peek_head(_iter_chunks(source))
+    if not is_obsidian_kanban_board(head, page_meta):
+        return
 
-    columns = []
-    current = None
-    all_tags_norm = set()
-
-    for line in md.splitlines():
+    in_column = False
+    for line in _iter_clean_lines(chunks):
         h = H2_RE.match(line)
         if h:
             title = h.group(1).strip()
-            is_archived = archive_keyword in title.lower()
-            current = {"title": title, "cards": [], "archived": is_archived}
-            columns.append(current)
+            in_column = True
+            yield "column", Column(title=title, archived=archive_keyword in title.lower(), cards=[])
             continue
 
-        if not current:
+        if not in_column:
             continue
 
         t = TASK_RE.match(line)
@@ -112,55 +555,82 @@ def parse_board(
             continue
 
         done = t.group(1).strip().lower() == "x"
-        raw_line = t.group(2).strip()
-
-        target = extract_first_wikilink_target(raw_line)
+        yield "card", (done, *tokenize_card(t.group(2).strip(), allowed_tags))
 
-        raw = wikilinks_to_text(raw_line)
-        dates, rest = extract_dates(raw)
-        tags_raw, title_txt = extract_tags(rest)
-        title_txt = title_txt.strip(" -") or "(sin título)"
 
-        # tags: normaliza y filtra si allowed_tags
-        tags_norm_all = sorted({norm_tag(x) for x in tags_raw})
-        if allowed_tags is not None:
-            tags_norm = [t for t in tags_norm_all if t in allowed_tags]
-            tags_display = [t for t in tags_raw if norm_tag(t) in allowed_tags]
+def cards_from_tokens(events, today: date):
+    """
+    Convierte los eventos de iter_board_tokens en los de iter_board. Todas las
+    fechas del tablero se clasifican contra la misma tabla de status.
+    """
+    statuses = kb_dates.status_table(today.toordinal())
+    for kind, item in events:
+        if kind == "card":
+            yield kind, card_from_tokens(*item, statuses)
         else:
-            tags_norm = tags_norm_all
-            tags_display = tags_raw
-
-        for tg in tags_norm:
-            all_tags_norm.add(tg)
-
-        # fechas/status
-        date_items = []
-        statuses_set = set()
-        dates_iso = []
-
-        for ds in dates:
-            d = parse_date(ds)
-            if d:
-                st = date_status(d, today)
-                statuses_set.add(st)
-                dates_iso.append(ds)
-                date_items.append((ds, st))
-            else:
-                date_items.append((ds, None))
-
-        current["cards"].append(
-            {
-                "done": done,
-                "title": title_txt,
-                "target": target,              # para resolver href luego
-                "href": None,                  # se rellena en hook.py
-                "date_items": date_items,
-                "tags": tags_display,          # ya filtradas si allowed_tags
-                "tags_norm": tags_norm,         # para filtros UI
-                "dates_iso": dates_iso,
-                "statuses": sorted(statuses_set),
-                "has_dates": bool(dates_iso),
-            }
-        )
+            yield kind, item
+
+
+def iter_board(
+    source: str | Iterable[str],
+    page_meta: dict,
+    today: date,
+    *,
+    allowed_tags: set[str] | None = None,
+    archive_keyword: str = "archiv",
+):
+    """
+    Versión en streaming de parse_board.
+
+    `source` puede ser el markdown completo o un iterable de trozos de texto
+    (p. ej. un fichero abierto). La entrada se va leyendo según se consume y
+    los comentarios/bloques kanban:settings se saltan sobre la marcha.
+
+    Emite tuplas:
+      ("column", Column)    # con cards vacío: las tarjetas llegan después
+      ("card", Card)
+    """
+    events = iter_board_tokens(
+        source,
+        page_meta,
+        allowed_tags=allowed_tags,
+        archive_keyword=archive_keyword,
+    )
+    return cards_from_tokens(events, today)
+
+
+def parse_board(
+    markdown: str,
+    page_meta: dict,
+    today: date,
+    *,
+    allowed_tags: set[str] | None = None,
+    archive_keyword: str = "archiv",
+):
+    """
+    Devuelve (columns, all_tags_norm)
+    columns: [Column(title, archived, cards=[...])]
+    card: Card(done,title,target,href?,date_items,tags,tags_norm,dates_iso,statuses,has_dates)
+
+    Column y Card admiten acceso tipo dict (col["cards"], c.get("href")...).
+    """
+    columns = []
+    current = None
+    all_tags_norm = set()
+
+    for kind, item in iter_board(
+        markdown,
+        page_meta,
+        today,
+        allowed_tags=allowed_tags,
+        archive_keyword=archive_keyword,
+    ):
+        if kind == "column":
+            current = item
+            columns.append(current)
+            continue
+
+        current.cards.append(item)
+        all_tags_norm.update(item.tags_norm)
 
     return columns, all_tags_norm
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from typing import Hashable, Iterable
+
+# Clasificación de rutas por "roots" (research/Developments, Archived...) con un
+# trie por segmentos: cada root es un camino del trie y su último nodo guarda
+# (orden, etiqueta). Clasificar una ruta es bajar por sus segmentos, así que
+# cuesta lo que su profundidad y no (nº de roots × longitud). Los roots se
+# normalizan una sola vez, al montar el clasificador.
+#
+# - anchored (por defecto): el root tiene que ser el principio de la ruta
+#   ("research/Developments" casa con "research/Developments/x.md")
+# - anywhere=True: el root puede empezar en cualquier segmento, como el
+#   "/root/" in "/ruta/" de dir_index ("Archived" casa con "docs/Archived/x.md").
+#   Se baja desde cada segmento: profundidad × profundidad del root más largo.
+#
+# El orden de las reglas es la prioridad: first() da la regla de menor orden que
+# casa, que es lo que hacían los bucles "el primer root que case"; match() las
+# da todas en ese orden.
+
+_END = None     # clave de lo que cuelga de un nodo (los segmentos son str)
+
+
+def _split_root(root: str) -> list[str]:
+    root = (root or "").replace("\\", "/").strip().strip("/")
+    return root.split("/") if root else []
+
+
+class PathClassifier:
+    """Trie de roots por segmentos; ver el comentario del módulo."""
+
+    __slots__ = ("ignore_case", "anywhere", "_trie", "_maxsplit", "size")
+
+    def __init__(self, rules: Iterable[tuple[str, Hashable]], *, ignore_case: bool = True, anywhere: bool = False):
+        self.ignore_case = ignore_case
+        self.anywhere = anywhere
+        self._trie: dict = {}
+        self.size = 0
+        depth = 0
+        for rank, (root, label) in enumerate(rules):
+            parts = _split_root(root.lower() if ignore_case else root)
+            if not parts:
+                continue    # root vacío: como antes, no casa con nada
+            node = self._trie
+            for seg in parts:
+                node = node.setdefault(seg, {})
+            # nodo final: (orden mínimo, [(orden, etiqueta)...])
+            end = node.get(_END)
+            node[_END] = (end[0], end[1] + [(rank, label)]) if end else (rank, [(rank, label)])
+            self.size += 1
+            depth = max(depth, len(parts))
+        # anchored: no hace falta partir más allá del root más profundo (el
+        # resto queda en un trozo con "/", que no es ningún segmento del trie)
+        self._maxsplit = -1 if anywhere else depth
+
+    def _parts(self, path: str) -> list[str]:
+        path = path.replace("\\", "/").strip("/") if path else ""
+        if self.ignore_case:
+            path = path.lower()
+        return path.split("/", self._maxsplit) if path else []
+
+    def _ends(self, parts: list[str]) -> list[tuple]:
+        """Los nodos finales por los que pasa la ruta."""
+        trie = self._trie
+        stop = len(parts)
+        out = []
+        for start in range(stop) if self.anywhere else range(min(stop, 1)):
+            node = trie
+            for i in range(start, stop):
+                node = node.get(parts[i])
+                if node is None:
+                    break
+                end = node.get(_END)
+                if end is not None:
+                    out.append(end)
+        return out
+
+    def match(self, path: str) -> tuple:
+        """Etiquetas de las reglas que casan, sin repetir y por orden de regla."""
+        parts = self._parts(path)
+        ends = self._ends(parts)
+        if not ends:
+            return ()
+        if len(ends) == 1 and len(ends[0][1]) == 1:
+            return (ends[0][1][0][1],)
+        out = []
+        for _, label in sorted(h for end in ends for h in end[1]):
+            if label not in out:
+                out.append(label)
+        return tuple(out)
+
+    def first(self, path: str):
+        """Etiqueta de la primera regla que casa (o None)."""
+        parts = self._parts(path)
+        ends = self._ends(parts)
+        if not ends:
+            return None
+        if len(ends) == 1:
+            return ends[0][1][0][1]
+        return min(h for end in ends for h in end[1])[1]
+
+
+def from_groups(groups: dict[Hashable, Iterable[str]], **kwargs) -> PathClassifier:
+    """{etiqueta: [roots]} -> clasificador; la prioridad sigue el orden del dict."""
+    return PathClassifier(((root, label) for label, roots in groups.items() for root in roots), **kwargs)
+
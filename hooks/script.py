@@ -1,7 +1,7 @@
 KB_SCRIPT = r"""<script>
 (function(){
   const wrap = document.querySelector('[data-kb-wrap="1"]');
-  if(!wrap) return;
+  if(!wrap || !window.KbFilter) return;
 
   const qEl = wrap.querySelector('[data-kb-filter="q"]');
   const statusEl = wrap.querySelector('[data-kb-filter="status"]');
@@ -22,8 +22,6 @@ KB_SCRIPT = r"""<script>
   // recordar estado de "ver completadas" cuando activas "solo archivados"
   let doneBeforeOnlyArchived = null;
 
-  function norm(s){ return (s||"").toString().trim().toLowerCase(); }
-
   function applyDoneColMode(){
     const showDone = !!(doneColEl && doneColEl.checked);
     wrap.classList.toggle('kb-show-done', showDone);
@@ -70,76 +68,41 @@ KB_SCRIPT = r"""<script>
     applyDoneColMode();
   }
 
-  function parseISO(d){
-    if(!d) return null;
-    const m = /^(\d{4})-(\d{2})-(\d{2})$/.exec(d);
-    if(!m) return null;
-    return new Date(Number(m[1]), Number(m[2]) - 1, Number(m[3])).getTime();
-  }
+  // status de las fechas calculados aquí (si el build no los trae)
+  window.KbFilter.markDates(wrap);
+
+  // tablero grande: las tarjetas vienen en JSON y se pintan virtualizadas
+  const island = wrap.querySelector('script[data-kb-data]');
+  const engine = (island && window.KbVirtualBoard)
+    ? window.KbVirtualBoard.create(wrap, JSON.parse(island.textContent))
+    : window.KbFilter.create({
+      groups: cols.map(col => ({
+        items: Array.from(col.querySelectorAll('.kb-card')),
+        empty: col.querySelector('[data-kb-empty="filtered"]'),
+      })),
+      hiddenClass: 'kb-hidden',
+      fields: { tags: 'data-tags', users: 'data-users' },
+    });
 
-  function anyDateInRange(dates, fromTs, toTs){
-    for(const ds of dates){
-      const ts = parseISO(ds);
-      if(ts === null) continue;
-      if(fromTs !== null && ts < fromTs) continue;
-      if(toTs !== null && ts > toTs) continue;
-      return true;
-    }
-    return false;
+  function filterState(){
+    return {
+      q: qEl && qEl.value,
+      status: (statusEl && statusEl.value) ? statusEl.value : "",
+      from: fromEl ? fromEl.value : "",
+      to: toEl ? toEl.value : "",
+      tags: activeTags,
+      users: activeUsers,
+    };
   }
 
+  // se recalcula en el siguiente frame (varios cambios seguidos = una pasada)
   function applyFilters(){
-    const q = norm(qEl && qEl.value);
-    const status = (statusEl && statusEl.value) ? statusEl.value : "";
-    const fromTs = fromEl && fromEl.value ? parseISO(fromEl.value) : null;
-    const toTs = toEl && toEl.value ? parseISO(toEl.value) : null;
-
-    cols.forEach(col => {
-      const cards = Array.from(col.querySelectorAll('.kb-card'));
-      let visibleCount = 0;
-
-      cards.forEach(card => {
-        const title = norm(card.getAttribute('data-title'));
-        const tags = (card.getAttribute('data-tags') || "").split(',').filter(Boolean);
-        const users = (card.getAttribute('data-users') || "").split(',').filter(Boolean);
-        const dates = (card.getAttribute('data-dates') || "").split(',').filter(Boolean);
-        const statuses = (card.getAttribute('data-statuses') || "").split(',').filter(Boolean);
-        const hasDates = (card.getAttribute('data-hasdates') || "0") === "1";
-
-        const okTitle = !q || title.includes(q);
-
-        let okTag = true;
-        if(activeTags.size > 0){
-          okTag = tags.some(t => activeTags.has(t));
-        }
-
-        let okUser = true;
-        if(activeUsers.size > 0){
-          okUser = users.some(u => activeUsers.has(u));
-        }
-
-        let okDate = true;
-        if(status === "nodate"){
-          okDate = !hasDates;
-        } else if(fromTs !== null || toTs !== null){
-          okDate = hasDates && anyDateInRange(dates, fromTs, toTs);
-        } else if(status){
-          okDate = statuses.includes(status);
-        }
-
-        const ok = okTitle && okTag && okUser && okDate;
-
-        card.classList.toggle('kb-hidden', !ok);
-        if(ok) visibleCount++;
-      });
-
-      const ph = col.querySelector('[data-kb-empty="filtered"]');
-      if(ph){
-        ph.style.display = (visibleCount === 0) ? 'block' : 'none';
-      }
-    });
+    engine.schedule(filterState);
   }
 
+  // escribir en el buscador no filtra en cada tecla
+  const applyFiltersTyping = window.KbFilter.debounce(applyFilters, 120);
+
   tagBtns.forEach(btn => {
     btn.addEventListener('click', () => {
       const t = btn.getAttribute('data-kb-tag');
@@ -183,7 +146,7 @@ KB_SCRIPT = r"""<script>
   applyArchiveModes(); // aquí ya fuerza completadas si solo-archivados está ON
   applyFilters();
 
-  bind(qEl, 'input', applyFilters);
+  bind(qEl, 'input', applyFiltersTyping);
   bind(statusEl, 'change', applyFilters);
   bind(fromEl, 'change', applyFilters);
   bind(toEl, 'change', applyFilters);
@@ -193,5 +156,508 @@ KB_SCRIPT = r"""<script>
 
   if(doneColEl) bind(doneColEl, 'change', () => { applyDoneColMode(); applyFilters(); });
 
+  // enlace a una tarjeta (#kb-..., p.ej. desde el buscador del site): si está
+  // en una columna oculta (completadas / archivadas) se enseña la columna
+  function revealTarget(){
+    const id = decodeURIComponent(location.hash.slice(1));
+    const card = id ? document.getElementById(id) : null;
+    if(!card || !wrap.contains(card) || !card.classList.contains('kb-card')) return;
+    if(card.closest('.kb-done-col') && doneColEl && !doneColEl.checked){
+      doneColEl.checked = true;
+      applyDoneColMode();
+    }
+    if(card.closest('.kb-archived') && archEl && !archEl.checked){
+      archEl.checked = true;
+      applyArchiveModes();
+    }
+    card.scrollIntoView({ block: 'center', inline: 'center' });
+  }
+
+  revealTarget();
+  window.addEventListener('hashchange', revealTarget);
+
+})();
+</script>"""
+
+
+# Motor de filtros compartido con dir_index (va como asset propio y se carga
+# antes que KB_SCRIPT / DIRINDEX_SCRIPT)
+FILTER_ENGINE_SCRIPT = r"""<script>
+(function(){
+  // Motor de filtros compartido por el tablero (script.KB_SCRIPT) y el índice de
+  // directorio (dir_index.DIRINDEX_SCRIPT). Lee los data-* de cada tarjeta una
+  // sola vez y los guarda en arrays tipados: tags/users/statuses como bitmasks,
+  // fechas como número de día (+ mínimo/máximo por tarjeta) y títulos en
+  // minúsculas. Filtrar es recorrer esos arrays; el DOM solo se toca para las
+  // tarjetas que cambian, todo junto en un requestAnimationFrame.
+  if(window.KbFilter) return;
+
+  const DAY_MS = 86400000;
+
+  function norm(s){ return (s||"").toString().trim().toLowerCase(); }
+
+  function splitAttr(el, name){
+    return (el.getAttribute(name) || "").split(',').filter(Boolean);
+  }
+
+  // Día (entero) de una fecha YYYY-MM-DD. Mismas reglas que el antiguo
+  // parseISO (new Date(y, m-1, d)): solo el formato exacto y con el mismo
+  // desbordamiento de mes/día, así que el orden entre fechas es el mismo.
+  function dayOf(d){
+    if(!d) return null;
+    const m = /^(\d{4})-(\d{2})-(\d{2})$/.exec(d);
+    if(!m) return null;
+    return Math.floor(Date.UTC(Number(m[1]), Number(m[2]) - 1, Number(m[3])) / DAY_MS);
+  }
+
+  // "Hoy" en Europe/Madrid como número de día (igual que dates.today_ordinal
+  // en el build). Para las páginas con status en el navegador (data-days /
+  // data-kb-day, ver dates.client_status).
+  function todayMadrid(){
+    try {
+      const parts = {};
+      new Intl.DateTimeFormat('en-US', {
+        timeZone: 'Europe/Madrid', year: 'numeric', month: '2-digit', day: '2-digit',
+      }).formatToParts(new Date()).forEach(p => { parts[p.type] = p.value; });
+      const d = dayOf(`${parts.year}-${parts.month}-${parts.day}`);
+      if(d !== null) return d;
+    } catch(e){}
+    const now = new Date();
+    return Math.floor(Date.UTC(now.getFullYear(), now.getMonth(), now.getDate()) / DAY_MS);
+  }
+
+  const TODAY = todayMadrid();
+
+  // como dates.status_of
+  function statusOfDay(day){
+    if(day < TODAY) return 'past';
+    if(day - TODAY < 7) return 'soon';
+    return 'later';
+  }
+
+  // como dates.statuses_for_isos: distintos y ordenados
+  function statusesOfDays(days){
+    return Array.from(new Set(days.map(statusOfDay))).sort();
+  }
+
+  // chips de fecha sin status (data-kb-day): se les pone la clase
+  function markDates(root){
+    root.querySelectorAll('.kb-date[data-kb-day]').forEach(el => {
+      el.classList.add(statusOfDay(Number(el.getAttribute('data-kb-day'))));
+    });
+  }
+
+  // string -> bit, con tantas palabras de 32 bits como haga falta
+  function Dict(){
+    this.ids = new Map();
+  }
+  Dict.prototype.id = function(s){
+    let id = this.ids.get(s);
+    if(id === undefined){
+      id = this.ids.size;
+      this.ids.set(s, id);
+    }
+    return id;
+  };
+  Dict.prototype.words = function(){ return Math.max(1, Math.ceil(this.ids.size / 32)); };
+
+  function packMasks(lists, dict){
+    const words = dict.words();
+    const masks = new Uint32Array(lists.length * words);
+    lists.forEach((ids, i) => {
+      for(const id of ids) masks[i * words + (id >>> 5)] |= (1 << (id & 31));
+    });
+    return { words, masks };
+  }
+
+  function maskOf(values, dict, words){
+    const mask = new Uint32Array(words);
+    for(const v of values){
+      const id = dict.ids.get(v);
+      if(id !== undefined) mask[id >>> 5] |= (1 << (id & 31));
+    }
+    return mask;
+  }
+
+  function intersects(packed, i, mask){
+    const base = i * packed.words;
+    for(let w = 0; w < packed.words; w++){
+      if(packed.masks[base + w] & mask[w]) return true;
+    }
+    return false;
+  }
+
+  function debounce(fn, ms){
+    let t = null;
+    return function(){
+      if(t !== null) clearTimeout(t);
+      t = setTimeout(() => { t = null; fn(); }, ms);
+    };
+  }
+
+  // Índice sobre registros ya leídos:
+  //   { title, tags: [], users: [], statuses: [], dates: ["YYYY-MM-DD"], hasDates }
+  // groupOf[i] es el grupo (columna) de cada registro.
+  function index(records, groupOf, nGroups){
+    const n = records.length;
+
+    const tagDict = new Dict(), userDict = new Dict(), statusDict = new Dict();
+    const tagLists = [], userLists = [], statusLists = [];
+    const titles = new Array(n);
+    const hasDates = new Uint8Array(n);
+    const dateMin = new Int32Array(n);
+    const dateMax = new Int32Array(n);
+    const dateStart = new Int32Array(n + 1);
+    const days = [];
+
+    records.forEach((r, i) => {
+      titles[i] = norm(r.title);
+      tagLists.push(r.tags.map(t => tagDict.id(t)));
+      userLists.push(r.users.map(u => userDict.id(u)));
+      statusLists.push(r.statuses.map(st => statusDict.id(st)));
+      hasDates[i] = r.hasDates ? 1 : 0;
+
+      let lo = 2147483647, hi = -2147483648;
+      for(const ds of r.dates){
+        const d = dayOf(ds);
+        if(d === null) continue;
+        days.push(d);
+        if(d < lo) lo = d;
+        if(d > hi) hi = d;
+      }
+      dateMin[i] = lo;
+      dateMax[i] = hi;
+      dateStart[i + 1] = days.length;
+    });
+
+    const dayArr = Int32Array.from(days);
+    const tagMasks = packMasks(tagLists, tagDict);
+    const userMasks = packMasks(userLists, userDict);
+    const statusMasks = packMasks(statusLists, statusDict);
+
+    function anyDayInRange(i, from, to){
+      if(dateMax[i] < from || dateMin[i] > to) return false;
+      if(dateMin[i] >= from && dateMax[i] <= to) return true;
+      for(let k = dateStart[i]; k < dateStart[i + 1]; k++){
+        const d = dayArr[k];
+        if(d >= from && d <= to) return true;
+      }
+      return false;
+    }
+
+    // state: { q, status, from, to, tags: Set, users: Set } (from/to: "YYYY-MM-DD" o "")
+    // match (opcional): Uint8Array por registro con el resultado de "q" ya
+    // calculado fuera (buscador de texto de dir_index); sin él, "q" va por título
+    function compute(state){
+      const q = norm(state.q);
+      const match = state.match || null;
+      const status = state.status || "";
+      const fromDay = state.from ? dayOf(state.from) : null;
+      const toDay = state.to ? dayOf(state.to) : null;
+      const useRange = fromDay !== null || toDay !== null;
+      const from = fromDay === null ? -2147483648 : fromDay;
+      const to = toDay === null ? 2147483647 : toDay;
+
+      const tagSet = state.tags || new Set();
+      const userSet = state.users || new Set();
+      const tagMask = tagSet.size ? maskOf(tagSet, tagDict, tagMasks.words) : null;
+      const userMask = userSet.size ? maskOf(userSet, userDict, userMasks.words) : null;
+      const statusMask = status && status !== "nodate" ? maskOf([status], statusDict, statusMasks.words) : null;
+
+      const next = new Uint8Array(n);
+      const counts = new Int32Array(nGroups);
+      for(let i = 0; i < n; i++){
+        if(match){
+          if(!match[i]) continue;
+        } else if(q && !titles[i].includes(q)) continue;
+        if(tagMask && !intersects(tagMasks, i, tagMask)) continue;
+        if(userMask && !intersects(userMasks, i, userMask)) continue;
+        if(status === "nodate"){
+          if(hasDates[i]) continue;
+        } else if(useRange){
+          if(!hasDates[i] || !anyDayInRange(i, from, to)) continue;
+        } else if(statusMask){
+          if(!intersects(statusMasks, i, statusMask)) continue;
+        }
+        next[i] = 1;
+        counts[groupOf[i]]++;
+      }
+      return { next, counts };
+    }
+
+    return { size: n, compute };
+  }
+
+  // Varias peticiones en el mismo frame se resuelven una sola vez con el
+  // último estado: run(getState) se llama dentro del requestAnimationFrame.
+  function frameScheduler(run){
+    let pending = null;
+    let frame = null;
+    return function schedule(getState){
+      pending = getState;
+      if(frame !== null) return;
+      frame = requestAnimationFrame(() => {
+        frame = null;
+        const get = pending;
+        pending = null;
+        run(get());
+      });
+    };
+  }
+
+  // Versión DOM: las tarjetas ya están en la página.
+  // groups: [{ items: [elementos tarjeta], empty: placeholder "sin resultados" | null }]
+  // fields: { tags: 'data-tags', users: 'data-users' | null }
+  function create(opts){
+    const hiddenClass = opts.hiddenClass;
+    const fields = opts.fields || {};
+
+    const items = [];
+    const groupOf = [];
+    const groups = opts.groups.map((g, gi) => {
+      for(const el of g.items){
+        items.push(el);
+        groupOf.push(gi);
+      }
+      return { empty: g.empty || null };
+    });
+    const n = items.length;
+
+    const records = items.map(el => ({
+      title: el.getAttribute('data-title'),
+      tags: fields.tags ? splitAttr(el, fields.tags) : [],
+      users: fields.users ? splitAttr(el, fields.users) : [],
+      statuses: el.hasAttribute('data-days')
+        ? statusesOfDays(splitAttr(el, 'data-days').map(Number))
+        : splitAttr(el, 'data-statuses'),
+      dates: splitAttr(el, 'data-dates'),
+      hasDates: (el.getAttribute('data-hasdates') || "0") === "1",
+    }));
+    const idx = index(records, groupOf, groups.length);
+
+    const visible = Uint8Array.from(items, el => el.classList.contains(hiddenClass) ? 0 : 1);
+    const emptyShown = groups.map(g => g.empty ? g.empty.style.display !== 'none' : false);
+
+    function commit(res){
+      for(let i = 0; i < n; i++){
+        if(res.next[i] !== visible[i]){
+          visible[i] = res.next[i];
+          items[i].classList.toggle(hiddenClass, !visible[i]);
+        }
+      }
+      groups.forEach((g, gi) => {
+        if(!g.empty) return;
+        const show = res.counts[gi] === 0;
+        if(show !== emptyShown[gi]){
+          emptyShown[gi] = show;
+          g.empty.style.display = show ? 'block' : 'none';
+        }
+      });
+    }
+
+    return {
+      size: n,
+      compute: idx.compute,
+      commit,
+      schedule: frameScheduler(state => commit(idx.compute(state))),
+    };
+  }
+
+  window.KbFilter = {
+    create, index, frameScheduler, debounce, dayOf, norm, statusOfDay, statusesOfDays, markDates,
+  };
+})();
+</script>"""
+
+
+# Pintado virtualizado de tableros grandes (solo se carga en esas páginas)
+VIRTUAL_BOARD_SCRIPT = r"""<script>
+(function(){
+  // Tablero virtualizado (modo "kanban-virtual"): el hook no pinta las
+  // tarjetas, manda un JSON con ellas (<script type="application/json"
+  // data-kb-data>) y aquí se pinta solo la ventana visible de cada columna.
+  //
+  // Formato:
+  //   tags:     [[display, norm, style, esUser], ...]   (diccionario compartido)
+  //   hrefs:    [href, ...]                            (ídem)
+  //   statuses: ["later", "past", "soon"]
+  //   cols:     [[done, [[title, hrefId|null, [tagId...], [[fecha, statusId|null]...]], ...]], ...]
+  // Con status en el navegador no hay `statuses` sino `days: 1`, y en cada
+  // fecha va su día (KbFilter.dayOf) en vez del id de status.
+  // El índice de cols es el data-kb-vcol de cada .kb-cards del html.
+  if(window.KbVirtualBoard) return;
+
+  const OVERSCAN = 8;       // tarjetas de más por arriba y por abajo
+  const GAP = 7;            // gap de .kb-vwindow (styles.KB_STYLE)
+  const EST_HEIGHT = 64;    // altura estimada hasta medir la primera ventana
+
+  function esc(s){
+    return String(s)
+      .replace(/&/g, '&amp;')
+      .replace(/</g, '&lt;')
+      .replace(/>/g, '&gt;')
+      .replace(/"/g, '&quot;')
+      .replace(/'/g, '&#x27;');
+  }
+
+  function create(wrap, data){
+    const F = window.KbFilter;
+    const tags = data.tags;
+    const hrefs = data.hrefs;
+    const statuses = data.statuses;
+    const statusOf = data.days ? F.statusOfDay : (st => statuses[st]);
+
+    const rows = [];
+    const doneOf = [];
+    const groupOf = [];
+    const records = [];
+    const members = data.cols.map(() => []);
+
+    data.cols.forEach(([done, colRows], ci) => {
+      for(const row of colRows){
+        const i = rows.length;
+        rows.push(row);
+        doneOf.push(done);
+        groupOf.push(ci);
+        members[ci].push(i);
+
+        // lo mismo que leería KbFilter.create de los data-* de la tarjeta
+        const tagNorms = new Set(), userNorms = new Set();
+        for(const id of row[2]){
+          (tags[id][3] ? userNorms : tagNorms).add(tags[id][1]);
+        }
+        const dates = [], sts = new Set();
+        for(const [ds, st] of row[3]){
+          if(st === null) continue;
+          dates.push(ds);
+          sts.add(statusOf(st));
+        }
+        records.push({
+          title: row[0],
+          tags: Array.from(tagNorms),
+          users: Array.from(userNorms),
+          statuses: Array.from(sts),
+          dates,
+          hasDates: dates.length > 0,
+        });
+      }
+    });
+
+    const idx = F.index(records, groupOf, data.cols.length);
+    const htmlCache = new Array(rows.length);
+
+    // Mismo html que hook.render_card (sin los data-* de filtrado, que aquí
+    // no hacen falta)
+    function cardHtml(i){
+      let h = htmlCache[i];
+      if(h !== undefined) return h;
+      const [title, hrefId, tagIds, dateItems] = rows[i];
+      const href = hrefId === null ? null : hrefs[hrefId];
+      const cls = doneOf[i] ? 'kb-card kb-done' : 'kb-card';
+      const t = esc(title);
+      h = href
+        ? `<a class="${cls}" href="${esc(href)}" data-title="${t}">`
+        : `<article class="${cls}" data-title="${t}">`;
+      h += `<div class="kb-card-title">${t}</div>`;
+
+      let chips = '';
+      for(const [ds, st] of dateItems){
+        const c = st === null ? 'kb-chip kb-date' : `kb-chip kb-date ${statusOf(st)}`;
+        chips += `<span class="${c}">${esc(ds)}</span>`;
+      }
+      for(const id of tagIds){
+        const tg = tags[id];
+        chips += tg[3]
+          ? `<span class="kb-chip kb-tag kb-user" style="${tg[2]}">@${esc(tg[0])}</span>`
+          : `<span class="kb-chip kb-tag" style="${tg[2]}">#${esc(tg[0])}</span>`;
+      }
+      if(chips) h += `<div class="kb-meta">${chips}</div>`;
+
+      h += href ? '</a>' : '</article>';
+      htmlCache[i] = h;
+      return h;
+    }
+
+    function VColumn(el, all){
+      this.el = el;
+      this.order = all;
+      this.est = EST_HEIGHT;
+      this.start = -1;
+      this.end = -1;
+      this.frame = null;
+
+      if(!all.length){
+        el.innerHTML = '<div class="kb-empty">—</div>';
+        this.empty = null;
+        return;
+      }
+      el.innerHTML =
+        '<div class="kb-vspacer"></div>' +
+        '<div class="kb-vwindow"></div>' +
+        '<div class="kb-vspacer"></div>' +
+        '<div class="kb-empty" data-kb-empty="filtered" style="display:none;">Sin resultados</div>';
+      [this.top, this.win, this.bottom, this.empty] = el.children;
+
+      el.addEventListener('scroll', () => {
+        if(this.frame !== null) return;
+        this.frame = requestAnimationFrame(() => { this.frame = null; this.render(false); });
+      }, { passive: true });
+    }
+
+    VColumn.prototype.render = function(force){
+      if(!this.empty) return;
+      const n = this.order.length;
+      const viewH = this.el.clientHeight || 600;   // columnas ocultas: da igual
+      const first = Math.floor(this.el.scrollTop / this.est);
+      const start = Math.max(0, Math.min(first, n) - OVERSCAN);
+      const end = Math.min(n, first + Math.ceil(viewH / this.est) + OVERSCAN);
+      if(!force && start === this.start && end === this.end) return;
+      this.start = start;
+      this.end = end;
+
+      let h = '';
+      for(let k = start; k < end; k++) h += cardHtml(this.order[k]);
+      this.win.innerHTML = h;
+
+      // altura media real de lo pintado, para los huecos de arriba/abajo
+      if(end > start && this.win.offsetHeight > 0){
+        this.est = (this.win.offsetHeight + GAP) / (end - start);
+      }
+      this.top.style.height = (start * this.est) + 'px';
+      this.bottom.style.height = ((n - end) * this.est) + 'px';
+      this.empty.style.display = n === 0 ? 'block' : 'none';
+    };
+
+    const columns = [];
+    wrap.querySelectorAll('[data-kb-vcol]').forEach(el => {
+      const ci = Number(el.getAttribute('data-kb-vcol'));
+      columns[ci] = new VColumn(el, Int32Array.from(members[ci]));
+    });
+
+    function commit(res){
+      columns.forEach((col, ci) => {
+        if(!col) return;
+        const all = members[ci];
+        const order = new Int32Array(res.counts[ci]);
+        let k = 0;
+        for(const i of all){
+          if(res.next[i]) order[k++] = i;
+        }
+        col.order = order;
+        col.render(true);
+      });
+    }
+
+    columns.forEach(col => col && col.render(true));
+
+    return {
+      size: rows.length,
+      compute: idx.compute,
+      commit,
+      schedule: F.frameScheduler(state => commit(idx.compute(state))),
+    };
+  }
+
+  window.KbVirtualBoard = { create };
 })();
 </script>"""
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import base64
+import re
+import unicodedata
+from typing import Iterable
+
+# Índice invertido de texto para el buscador de dir_index: palabra -> ids de las
+# entradas que la contienen. Las palabras de cada nota (título + cuerpo) salen
+# de la misma lectura que título/tags/fechas (doc_meta.scan_source); aquí solo
+# se normalizan y se monta el JSON que consulta el navegador.
+#
+# Formato (build()):
+#   total:   nº de entradas (ids 0..total-1, en el orden del índice de directorio)
+#   tokens:  palabras distintas, ordenadas
+#   post:    por palabra, sus ids en diferencias (ids crecientes: [3, 1, 5] = 3, 4, 9)
+#            o, si ocupa menos (palabras muy comunes), un bitmap en base64: el
+#            bit (id & 7) del byte (id >> 3) a 1 si la entrada la contiene
+#   buckets: {dos primeras letras: [inicio, fin)} del tramo de tokens que empieza
+#            así; una búsqueda por prefijo solo mira su tramo
+#
+# Las palabras se comparan sin mayúsculas ni acentos (fold), igual que el
+# `terms` de DIRINDEX_SEARCH_SCRIPT: \w de Python es [\p{L}\p{N}_] en JS.
+
+MIN_WORD = 2        # las de una letra no se indexan (la búsqueda por prefijo sí las acepta)
+MAX_WORD = 32       # las largas se recortan (igual en el navegador)
+BUCKET = 2          # letras de la clave de los buckets
+
+_COMBINING_RE = re.compile(r"[\u0300-\u036f]")
+# con las marcas combinantes dentro: "decisio\u0301n" es una palabra ("decision")
+_WORD_RE = re.compile(r"[\w\u0300-\u036f]+")
+# urls: solo meten "https", "www", trozos de rutas...
+_URL_RE = re.compile(r"\bhttps?://\S+")
+
+
+def fold(text: str) -> str:
+    """Minúsculas y sin acentos (NFD sin las marcas combinantes)."""
+    if text.isascii():
+        return text.lower()
+    return _COMBINING_RE.sub("", unicodedata.normalize("NFD", text)).lower()
+
+
+def words(text: str) -> tuple[str, ...]:
+    """Palabras distintas (ya normalizadas) de un texto, en orden de aparición."""
+    if not text:
+        return ()
+    if "://" in text:
+        text = _URL_RE.sub(" ", text)
+    out = {}
+    # se normaliza cada palabra distinta, no el texto entero (bastante más barato)
+    for w in dict.fromkeys(_WORD_RE.findall(text.lower())):
+        if not w.isascii():
+            w = fold(w)
+            # fuera las que tienen caracteres fuera del BMP: en JS serían dos
+            # unidades UTF-16 y el orden/los prefijos no coincidirían
+            if w and max(w) > "\uffff":
+                continue
+        if len(w) >= MIN_WORD:
+            out[w[:MAX_WORD]] = None
+    return tuple(out)
+
+
+def merge(*parts: Iterable[str]) -> tuple[str, ...]:
+    """Une listas de palabras sin repetir (orden de la primera aparición)."""
+    return tuple(dict.fromkeys(w for p in parts for w in p))
+
+
+def _encode(ids: list[int], total: int) -> list[int] | str:
+    deltas = [ids[0]] + [b - a for a, b in zip(ids, ids[1:])]
+    # tamaño en el JSON: los dígitos y una coma por id, contra ~total/6 del bitmap
+    as_list = sum(map(len, map(str, deltas))) + len(deltas) + 1
+    as_bitmap = 4 * -(-((total + 7) // 8) // 3) + 2
+    if as_list <= as_bitmap:
+        return deltas
+    bits = bytearray((total + 7) // 8)
+    for i in ids:
+        bits[i >> 3] |= 1 << (i & 7)
+    return base64.b64encode(bytes(bits)).decode("ascii")
+
+
+def build(docs: list[Iterable[str]]) -> dict:
+    """Índice (ver el comentario del módulo); docs[i] son las palabras de la entrada i."""
+    postings: dict[str, list[int]] = {}
+    for i, ws in enumerate(docs):
+        for w in ws:
+            ids = postings.get(w)
+            if ids is None:
+                postings[w] = [i]
+            elif ids[-1] != i:
+                ids.append(i)
+
+    tokens = sorted(postings)
+    post = []
+    buckets: dict[str, list[int]] = {}
+    for k, w in enumerate(tokens):
+        post.append(_encode(postings[w], len(docs)))
+        b = buckets.get(w[:BUCKET])
+        if b is None:
+            buckets[w[:BUCKET]] = [k, k + 1]
+        else:
+            b[1] = k + 1
+
+    return {"total": len(docs), "tokens": tokens, "post": post, "buckets": buckets}
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from html import escape
+
+from mkdocs.structure.files import File
+
+import urls as kb_urls
+
+# CSS/JS de los hooks como ficheros estáticos del site (en vez de inline en cada
+# página). El nombre lleva el hash del contenido, así que el navegador puede
+# cachearlos sin miedo: si cambian, cambia la URL.
+
+ASSETS_DIR = "assets/kanban"
+
+
+@dataclass(frozen=True, slots=True)
+class StaticAsset:
+    src_uri: str    # ruta dentro del site, p.ej. assets/kanban/kanban.1a2b3c4d5e.css
+    content: str
+
+    def url_for(self, page) -> str:
+        return kb_urls.relative_url(self.src_uri, page.url)
+
+
+def _unwrap(blob: str, tag: str) -> str:
+    """Quita el <style>/<script> que envuelve los bloques inline de siempre."""
+    body = blob.strip()
+    open_tag, close_tag = f"<{tag}>", f"</{tag}>"
+    if body.startswith(open_tag):
+        body = body[len(open_tag):]
+    if body.endswith(close_tag):
+        body = body[:-len(close_tag)]
+    return body.strip("\n") + "\n"
+
+
+def static_asset(name: str, ext: str, blob: str) -> StaticAsset:
+    """Asset con hash a partir de un bloque <style>...</style> o <script>...</script>."""
+    content = _unwrap(blob, "style" if ext == "css" else "script")
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:10]
+    return StaticAsset(f"{ASSETS_DIR}/{name}.{digest}.{ext}", content)
+
+
+def add_to_files(files, config, assets) -> None:
+    """Para on_files: los assets pasan a ser ficheros generados del build."""
+    for asset in assets:
+        if files.get_file_from_path(asset.src_uri) is None:
+            files.append(File.generated(config, asset.src_uri, content=asset.content))
+
+
+def stylesheet_tag(asset: StaticAsset, page) -> str:
+    return f'<link rel="stylesheet" href="{escape(asset.url_for(page), quote=True)}">'
+
+
+def script_tag(asset: StaticAsset, page) -> str:
+    return f'<script defer src="{escape(asset.url_for(page), quote=True)}"></script>'
@@ -181,6 +181,19 @@ KB_STYLE = r"""<style>
   gap:7px;
 }
 
+/* Tablero virtualizado: cada columna hace scroll y solo pinta lo visible */
+.kb-cards.kb-virtual{
+  display:block;
+  max-height: 75vh;
+  overflow-y:auto;
+  overscroll-behavior: contain;
+}
+.kb-vwindow{
+  display:flex;
+  flex-direction:column;
+  gap:7px;
+}
+
 .kb-empty{
   opacity:.6;
   text-align:center;
@@ -198,6 +211,7 @@ KB_STYLE = r"""<style>
   transition: transform .08s ease, box-shadow .08s ease;
 }
 .kb-card:hover{ transform: translateY(-1px); box-shadow:0 8px 20px var(--kb-shadow); }
+.kb-card:target{ outline:2px solid var(--md-accent-fg-color); outline-offset:2px; }
 .kb-done{ opacity:.65; }
 
 .kb-card-title{
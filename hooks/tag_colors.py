@@ -3,19 +3,13 @@ from __future__ import annotations
 import json
 from pathlib import Path
 
-_TAG_COLORS = None
+import cache_registry as kb_registry
 
-_USER_TAG_COLORS = None
+_HERE = Path(__file__).resolve().parent
 
-def load_user_tag_colors() -> dict:
-    """Carga hooks/obsidian_kanban/user_tag_colors.json y normaliza keys a MAYÚSCULAS."""
-    global _USER_TAG_COLORS
-    if _USER_TAG_COLORS is not None:
-        return _USER_TAG_COLORS
-
-    here = Path(__file__).resolve().parent
-    cfg_path = here / "user_tag_colors.json"
 
+def _read_colors(cfg_path: Path) -> dict:
+    """Lee un json de colores y normaliza keys a MAYÚSCULAS."""
     raw = {"__default__": {"bg": "#8080801a", "fg": "#cfcfcf"}}
 
     if cfg_path.exists():
@@ -34,42 +28,29 @@ def load_user_tag_colors() -> dict:
         normalized[key] = v
 
     normalized.setdefault("__default__", {"bg": "#8080801a", "fg": "#cfcfcf"})
-    _USER_TAG_COLORS = normalized
     return normalized
 
-def norm_tag(tag: str) -> str:
-    return tag.strip().lstrip("#").upper()
-
 
-def load_tag_colors() -> dict:
-    """Carga hooks/obsidian_kanban/tag_colors.json y normaliza keys a MAYÚSCULAS."""
-    global _TAG_COLORS
-    if _TAG_COLORS is not None:
-        return _TAG_COLORS
+# Se recargan solos si el json cambia (se mira una vez por build)
+_TAG_COLORS = kb_registry.file_value(
+    "tag_colors", [_HERE / "tag_colors.json"], lambda: _read_colors(_HERE / "tag_colors.json")
+)
+_USER_TAG_COLORS = kb_registry.file_value(
+    "user_tag_colors", [_HERE / "user_tag_colors.json"], lambda: _read_colors(_HERE / "user_tag_colors.json")
+)
 
-    here = Path(__file__).resolve().parent
-    cfg_path = here / "tag_colors.json"
 
-    raw = {"__default__": {"bg": "#8080801a", "fg": "#cfcfcf"}}
+def load_user_tag_colors() -> dict:
+    """Carga hooks/obsidian_kanban/user_tag_colors.json y normaliza keys a MAYÚSCULAS."""
+    return _USER_TAG_COLORS.get()
 
-    if cfg_path.exists():
-        try:
-            data = json.loads(cfg_path.read_text(encoding="utf-8"))
-            if isinstance(data, dict):
-                raw.update(data)
-        except Exception:
-            pass
+def norm_tag(tag: str) -> str:
+    return tag.strip().lstrip("#").upper()
 
-    normalized = {}
-    for k, v in raw.items():
-        if not isinstance(v, dict):
-            continue
-        key = "__default__" if k == "__default__" else norm_tag(k)
-        normalized[key] = v
 
-    normalized.setdefault("__default__", {"bg": "#8080801a", "fg": "#cfcfcf"})
-    _TAG_COLORS = normalized
-    return normalized
+def load_tag_colors() -> dict:
+    """Carga hooks/obsidian_kanban/tag_colors.json y normaliza keys a MAYÚSCULAS."""
+    return _TAG_COLORS.get()
 
 
 def tag_style(tag_colors: dict, tag: str) -> str:
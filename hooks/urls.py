@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import posixpath
+
+import cache_registry as kb_registry
+
+# URLs relativas compartidas por los hooks. get_relative_url(url, page.url) solo
+# depende de la url destino y de la carpeta de la página, y casi siempre se
+# reduce a "prefijo + último trozo de url", donde el prefijo solo depende de la
+# carpeta del destino y de la de la página. Las cachés van por esas dos cosas,
+# que son pocas (un índice con miles de entradas en 60 carpetas son 60 prefijos
+# por página), en vez de por cada par (url, página).
+#
+# La carpeta de la página se saca igual que get_relative_url: si el último trozo
+# de page.url lleva un punto es un fichero y se quita. Con use_directory_urls
+# cada página ("a/b/") es su propia carpeta; sin él, "a/b.html" y "a/c.html"
+# comparten "a" (y sus resultados).
+
+_PAGES = kb_registry.cache("urls.pages", maxsize=20_000)            # page.url -> for_page(...)
+# carpeta de página -> {carpeta destino: prefijo}; LRU por carpeta de página
+_PREFIXES = kb_registry.cache("urls.prefixes", maxsize=5_000)
+
+
+def _norm_parts(path: str) -> list[str]:
+    # como mkdocs.utils._norm_parts
+    if not path.startswith("/"):
+        path = "/" + path
+    path = posixpath.normpath(path)[1:]
+    return path.split("/") if path else []
+
+
+def _relative_parts(other_parts: list[str], dest_parts: list[str]) -> list[str]:
+    common = 0
+    for a, b in zip(other_parts, dest_parts):
+        if a != b:
+            break
+        common += 1
+    return [".."] * (len(other_parts) - common) + dest_parts[common:]
+
+
+def page_dir(page_url: str) -> str:
+    """Carpeta (normalizada) desde la que se resuelven los enlaces de `page_url`."""
+    dirname, _, basename = page_url.rpartition("/")
+    return "/".join(_norm_parts(dirname if "." in basename else page_url))
+
+
+def _slow_relative_url(url: str, d: str) -> str:
+    rel = "/".join(_relative_parts(d.split("/") if d else [], _norm_parts(url))) or "."
+    return rel + "/" if url.endswith("/") else rel
+
+
+def for_page(page_url: str):
+    """
+    Función url -> url relativa a `page_url` (igual que get_relative_url).
+    Para los bucles: se saca una vez por página y se llama por cada entrada.
+    """
+    relative = _PAGES.get(page_url)
+    if relative is None:
+        relative = _PAGES[page_url] = _make_relative(page_dir(page_url))
+    return relative
+
+
+def _make_relative(d: str):
+    d_parts = d.split("/") if d else []
+    prefixes = _PREFIXES.get(d)
+    if prefixes is None:
+        prefixes = _PREFIXES[d] = {}
+
+    def relative(url: str) -> str:
+        # las urls de mkdocs ya vienen normalizadas; las raras van por el camino lento
+        if not url or url[0] in "./" or "//" in url or "/." in url:
+            return _slow_relative_url(url, d)
+        slash = url[-1] == "/"
+        full = url[:-1] if slash else url
+        # página dentro del propio destino: no es "prefijo + último"
+        if d and (d == full or d.startswith(full + "/")):
+            return _slow_relative_url(url, d)
+        parent, _, last = full.rpartition("/")
+        prefix = prefixes.get(parent)
+        if prefix is None:
+            rel = _relative_parts(d_parts, parent.split("/") if parent else [])
+            prefix = prefixes[parent] = "/".join(rel) + "/" if rel else ""
+        return prefix + last + "/" if slash else prefix + last
+
+    return relative
+
+
+def relative_url(url: str, page_url: str) -> str:
+    """Igual que get_relative_url(url, page_url)."""
+    return for_page(page_url)(url)
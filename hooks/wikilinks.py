@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import logging
+import posixpath
+import re
+import sys
+from pathlib import Path
+from urllib.parse import quote
+
+from markdown.extensions.toc import slugify as default_slugify
+
+_THIS_DIR = Path(__file__).resolve().parent
+if str(_THIS_DIR) not in sys.path:
+    sys.path.insert(0, str(_THIS_DIR))
+
+import link_graph as kb_graph  # noqa: E402
+import links as kb_links  # noqa: E402
+import page_scan  # noqa: E402
+import cache_registry as kb_registry  # noqa: E402
+import urls as kb_urls  # noqa: E402
+
+
+log = logging.getLogger(f"mkdocs.hooks.{__name__}")
+
+# [[Nota]] / [[Nota|Texto]] / [[Nota#Sección|Texto]] en páginas normales (los
+# tableros ya los resuelve hook.py) -> [Texto](ruta/relativa/Nota.md#seccion).
+# Se enlaza al .md y no a la url: mkdocs lo traduce a la url final (con o sin
+# use_directory_urls) y valida que exista.
+#
+# Una sola pasada con links.PAGE_WIKILINK_RE: los bloques de código y el código
+# inline se devuelven tal cual. Los embeds ![[...]] no se tocan.
+
+# (src_uri destino, carpeta de la página) -> ruta relativa ya escapada (%20...)
+_RELATIVE = kb_registry.cache("wikilinks.relative", maxsize=50_000)
+
+# contadores del build (un solo dict; se vacía con el resto en reset_build)
+_STATS = kb_registry.cache("wikilinks.stats")
+
+
+def _counts() -> dict[str, int]:
+    return _STATS.get_or_create("counts", lambda: {"pages": 0, "links": 0, "unresolved": 0})
+
+
+def _relative_src(src: str, folder: str) -> str:
+    key = (src, folder)
+    rel = _RELATIVE.get(key)
+    if rel is None:
+        # la barra final marca `folder` como carpeta
+        rel = _RELATIVE[key] = quote(kb_urls.relative_url(src, f"{folder}/"))
+    return rel
+
+
+def _toc_slugify(config):
+    toc = (config.get("mdx_configs") or {}).get("toc") or {}
+    slugify = toc.get("slugify") or default_slugify
+    separator = toc.get("separator", "-")
+    return lambda s: slugify(s, separator)
+
+
+def rewrite_wikilinks(markdown: str, page, config, files) -> str:
+    resolver = kb_links.get_resolver(files, config)
+    folder = posixpath.dirname(page.file.src_uri)
+    slugify = _toc_slugify(config)
+    counts = _counts()
+    # para el grafo de link_graph: (nota, src_uri destino | None, None)
+    found: list[tuple[str, str | None, None]] = []
+
+    def _sub(m: re.Match) -> str:
+        raw = m.group("target")
+        if raw is None or m.group("embed"):
+            return m.group(0)
+
+        name, heading = kb_links.split_page_target(raw)
+        frag = f"#{slugify(heading)}" if heading and not heading.startswith("^") else ""
+
+        if name:
+            src = resolver.note_src(name, folder)
+            found.append((name, src, None))
+            if src is None:
+                counts["unresolved"] += 1
+                return m.group(0)
+            href = _relative_src(src, folder) + frag
+        elif frag:
+            href = frag     # [[#Sección]]: la propia página
+        else:
+            return m.group(0)
+
+        counts["links"] += 1
+        label = m.group("label") or (f"{name} > {heading}" if name and frag else name or heading)
+        label = label.strip().replace("[", "\\[")
+        return f"[{label}]({href})"
+
+    counts["pages"] += 1
+    markdown = kb_links.PAGE_WIKILINK_RE.sub(_sub, markdown)
+    kb_graph.set_page_links(page.file.src_uri, found)
+    return markdown
+
+
+def on_page_markdown(markdown, page, config, files, **kwargs):
+    features = page_scan.scan_page(markdown, page)
+    if features.kanban or not features.wikilinks:
+        return markdown
+    return rewrite_wikilinks(markdown, page, config, files)
+
+
+def on_shutdown(**kwargs):
+    kb_registry.shutdown()
+
+
+def on_post_build(config, **kwargs):
+    log.debug("wikilinks en páginas: %s", _counts())
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Los hooks se cargan como módulos sueltos (mkdocs añade hooks/ al sys.path)
+_HOOKS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "hooks")
+if _HOOKS_DIR not in sys.path:
+    sys.path.insert(0, _HOOKS_DIR)
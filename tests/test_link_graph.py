@@ -0,0 +1,93 @@
+import pytest
+from mkdocs.config import load_config
+from mkdocs.structure.files import get_files
+from mkdocs.structure.pages import Page
+
+import cache_registry as kb_registry
+import hook
+import link_graph as kb_graph
+import wikilinks
+
+PAGES = {
+    # "Developments/dup.md" va antes: por nombre se elegiría esa, por ruta es "Archived/dup.md"
+    "Developments/dup.md": "sin enlaces",
+    "Archived/dup.md": "[[a]]",
+    "a.md": (
+        "---\n"
+        "title: '[[d]]'\n"
+        "---\n"
+        "[[b]] y [[c|la c]] y [[b#Sección]] y [[#Local]]\n"
+        "`[[d]]` en línea\n"
+        "```\n[[d]]\n```\n"
+        "![[e]]\n"
+        "[[Archived/dup]] y [[no existe]]\n"
+    ),
+    "b.md": "[[a#Arriba]] y [[c\\|tabla]]",
+    "c.md": "",
+    "d.md": "",
+    "e.md": "",
+    "tablero.md": (
+        "---\n"
+        "kanban-plugin: board\n"
+        "---\n"
+        "## Pendiente\n"
+        "- [ ] [[c]] y [[d]]\n"
+        "- [ ] tarea sin enlace\n"
+        "## Archivo\n"
+        "- [x] [[dup]]\n"
+        "- [ ] [[fantasma]]\n"
+    ),
+}
+
+
+@pytest.fixture
+def graph(tmp_path):
+    docs = tmp_path / "docs"
+    for src, text in PAGES.items():
+        path = docs / src
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    (tmp_path / "mkdocs.yml").write_text("site_name: test\n", encoding="utf-8")
+    config = load_config(str(tmp_path / "mkdocs.yml"))
+
+    kb_registry.reset_build()
+    files = get_files(config)
+    # los enlaces salen de los propios hooks al procesar cada página
+    for f in files.documentation_pages():
+        page = Page(None, f, config)
+        page.read_source(config)
+        markdown = hook.on_page_markdown(page.markdown, page=page, config=config, files=files)
+        wikilinks.on_page_markdown(markdown, page=page, config=config, files=files)
+    yield kb_graph.get_graph(files)
+    kb_registry.reset_build()
+
+
+def _ids(g, *srcs):
+    return [g.id_of(s) for s in srcs]
+
+
+def _names(g, nodes):
+    return sorted(g.pages[i] for i in nodes)
+
+
+def test_forward_edges(graph):
+    # ni front matter, ni código, ni embeds; la ruta gana al índice por nombre
+    assert _names(graph, graph.links_from(graph.id_of("a.md"))) == ["Archived/dup.md", "b.md", "c.md"]
+    assert _names(graph, graph.links_from(graph.id_of("b.md"))) == ["a.md", "c.md"]
+    # tarjetas: solo el primer wikilink, con los roots de su columna
+    assert _names(graph, graph.links_from(graph.id_of("tablero.md"))) == ["Archived/dup.md", "c.md"]
+
+
+def test_back_edges(graph):
+    assert _names(graph, graph.links_to(graph.id_of("c.md"))) == ["a.md", "b.md", "tablero.md"]
+    assert _names(graph, graph.links_to(graph.id_of("a.md"))) == ["Archived/dup.md", "b.md"]
+    assert list(graph.links_to(graph.id_of("d.md"))) == []
+    assert list(graph.links_to(graph.id_of("e.md"))) == []
+    assert _names(graph, graph.orphans()) == ["Developments/dup.md", "d.md", "e.md", "tablero.md"]
+
+
+def test_broken_and_stats(graph):
+    a, tablero = _ids(graph, "a.md", "tablero.md")
+    assert sorted(graph.broken) == [(a, "no existe"), (tablero, "fantasma")]
+    # a: b, c, b#Sección, Archived/dup, no existe; b: a, c; Archived/dup: a; tablero: 3 tarjetas
+    assert graph.stats() == {"pages": 8, "links": 11, "edges": 8, "broken": 2, "orphans": 4}
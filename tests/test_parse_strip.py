@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+import parse as kb_parse
+
+# Fuzz diferencial de los recortes lineales de parse.py contra las regex que
+# documentan su semántica (OBSIDIAN_COMMENT_RE, KANBAN_SETTINGS_*_RE).
+
+PIECES = [
+    "%", "%%", "`", "```", "kanban:settings", "KANBAN:Settings", "Kanban:settings",
+    "kanban:setting", "\n", "\r", "\r\n", " ", "\t", "\x0b", "a", "## Col", "- [ ] x",
+    "%% kanban:settings\n```\n{}\n```\n%%", "#t", "@{2026-01-01}",
+]
+CASES = 20_000
+
+
+def _regex_comments(s: str) -> str:
+    return kb_parse.OBSIDIAN_COMMENT_RE.sub("", s)
+
+
+def _regex_settings(s: str) -> str:
+    s = kb_parse.KANBAN_SETTINGS_COMMENT_RE.sub("", s)
+    return kb_parse.KANBAN_SETTINGS_FENCE_RE.sub("", s)
+
+
+def _random_doc(rnd: random.Random) -> str:
+    return "".join(rnd.choice(PIECES) for _ in range(rnd.randint(0, 25)))
+
+
+def _chunked(s: str, rnd: random.Random) -> list[str]:
+    out = []
+    i = 0
+    while i < len(s):
+        k = rnd.randint(1, 6)
+        out.append(s[i:i + k])
+        i += k
+    return out
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_strip_matches_regex(seed):
+    rnd = random.Random(seed)
+    for _ in range(CASES):
+        s = _random_doc(rnd)
+        assert kb_parse.strip_obsidian_comments(s) == _regex_comments(s), repr(s)
+        assert kb_parse.strip_kanban_settings(s) == _regex_settings(s), repr(s)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_streaming_stages_match_regex(seed):
+    rnd = random.Random(100 + seed)
+    for _ in range(CASES):
+        s = _random_doc(rnd)
+        chunks = _chunked(s, rnd)
+        assert "".join(kb_parse._iter_without_comments(chunks)) == _regex_comments(s), repr(s)
+        got = "".join(kb_parse._iter_without_settings_fences(kb_parse._iter_without_settings_comments(chunks)))
+        assert got == _regex_settings(s), repr(s)
+
+
+@pytest.mark.parametrize("seed", range(2))
+def test_clean_lines_match_strip_and_splitlines(seed):
+    rnd = random.Random(200 + seed)
+    for _ in range(CASES):
+        s = _random_doc(rnd)
+        expected = _regex_settings(_regex_comments(s)).splitlines()
+        assert list(kb_parse._iter_clean_lines(kb_parse._iter_chunks(s))) == expected, repr(s)
+        assert list(kb_parse._iter_clean_lines(iter(_chunked(s, rnd)))) == expected, repr(s)
+
+
+def test_unclosed_markers_are_kept():
+    s = "a %% b ``` kanban:settings c"
+    assert kb_parse.strip_obsidian_comments(s) == s
+    assert kb_parse.strip_kanban_settings(s) == s
+    assert kb_parse.strip_kanban_settings("x\n%% kanban:settings\n{}\n%%\ny") == "x\n\ny"